@@ -1,19 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+import os
 import re
+from collections import OrderedDict
 from collections.abc import AsyncIterable
-from typing import Any, Literal
+from contextlib import aclosing
+from typing import Any, Literal, NamedTuple
 
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 from pydantic import BaseModel
 
+from backend.utils.error_logging import VERBOSE_ERRORS
+
 logger = logging.getLogger(__name__)
 
+
 # ---------------------------------------------------------------------------
 # Mock data
 # ---------------------------------------------------------------------------
@@ -38,15 +46,43 @@ STORE_HOURS = {
     "sunday": "10:00 AM - 7:00 PM",
 }
 
+# Caps concurrent graph work (and so Gemini calls) so load bursts queue here
+# instead of tripping provider rate limits and 429 retry storms. Held only while
+# the graph advances, never while a client is consuming streamed events.
+_GEMINI_SEM = asyncio.Semaphore(int(os.getenv("CS_GEMINI_CONCURRENCY", "16")))
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+_TRAILING_PUNCTUATION = re.compile(r"[!?.,]+$")
+# A bare or differently separated "ORD" prefix, e.g. "ORD12345" or "ORD 12345"
+_ORDER_PREFIX = re.compile(r"^ORD[-\s]?")
+
+INVENTORY_ROUTING_MESSAGE = (
+    "I need to check our inventory system for product availability. "
+    "Please ask the host agent to route your query to the inventory agent."
+)
+
 
 def _clean_order_id(raw: str) -> str:
     """Return canonical `ORD-xxxxx` (upper-case, no trailing punctuation)."""
-    oid = re.sub(r"[!?.,]+$", "", raw.strip()).upper()
-    return oid if oid.startswith("ORD-") else f"ORD-{oid.lstrip('ORD-')}"
+    oid = _TRAILING_PUNCTUATION.sub("", raw.strip()).upper()
+    return f"ORD-{_ORDER_PREFIX.sub('', oid)}"
+
+
+def _format_order_status(order_id: str, order: dict[str, Any]) -> str:
+    """Render the customer-facing status line for an order."""
+    parts = [f"Order {order_id} is currently {order['status']}."]
+    if order["status"] == "shipped":
+        parts.append(f"Tracking number: {order['tracking_number']}")
+    parts.append(f"Items: {', '.join(order['items'])}")
+    parts.append(f"Total: ${order['total']}")
+    return " ".join(parts)
+
+
+# ORDERS is static mock data, so every status response can be rendered once at import.
+_ORDER_STATUS_RESPONSES: dict[str, str] = {oid: _format_order_status(oid, order) for oid, order in ORDERS.items()}
 
 
 # ---------------------------------------------------------------------------
@@ -57,27 +93,19 @@ def _clean_order_id(raw: str) -> str:
 @tool
 def check_order_status(order_id: str) -> str:
     """Check the status of an order by order ID. Use this when a customer asks about their order."""
-    logger.info(f"Checking order status for: {order_id}")
+    logger.info("Checking order status for: %s", order_id)
     order_id = _clean_order_id(order_id)
-    order = ORDERS.get(order_id)
-    if not order:
+    result = _ORDER_STATUS_RESPONSES.get(order_id)
+    if result is None:
         return f"I couldn't find order {order_id}. Please verify the order number."
 
-    parts = [f"Order {order_id} is currently {order['status']}."]
-    if order["status"] == "shipped":
-        parts.append(f"Tracking number: {order['tracking_number']}")
-    parts.append(f"Items: {', '.join(order['items'])}")
-    parts.append(f"Total: ${order['total']}")
-
-    result = " ".join(parts)
-    logger.info(f"Order status result: {result}")
+    logger.info("Order status result: %s", result)
     return result
 
 
-@tool
-def get_store_hours(location: str = "main") -> str:
-    """Get the store hours for a specific location. Use this when asked about store hours or opening times."""
-    logger.info(f"Getting store hours for location: {location}")
+@functools.lru_cache(maxsize=32)
+def _store_hours_text(location: str) -> str:
+    """Render the store hours message for a location."""
     return (
         f"Store hours for {location} location:\n"
         f"Monday-Friday: {STORE_HOURS['monday-friday']}\n"
@@ -86,10 +114,17 @@ def get_store_hours(location: str = "main") -> str:
     )
 
 
+@tool
+def get_store_hours(location: str = "main") -> str:
+    """Get the store hours for a specific location. Use this when asked about store hours or opening times."""
+    logger.info("Getting store hours for location: %s", location)
+    return _store_hours_text(location)
+
+
 @tool
 def process_return_request(order_id: str, product_name: str, reason: str) -> str:
     """Process a return request for a product. Use this when a customer wants to return an item."""
-    logger.info(f"Processing return for order {order_id}, product: {product_name}, reason: {reason}")
+    logger.info("Processing return for order %s, product: %s, reason: %s", order_id, product_name, reason)
     rid = f"RET-{_clean_order_id(order_id)[-5:]}"
     return (
         f"Return request {rid} has been created for {product_name} from order {order_id}. "
@@ -101,7 +136,39 @@ def process_return_request(order_id: str, product_name: str, reason: str) -> str
 # LangGraph wiring
 # ---------------------------------------------------------------------------
 
-memory = MemorySaver()
+
+class BoundedMemorySaver(MemorySaver):
+    """MemorySaver that only keeps the ``max_threads`` most recently active conversations."""
+
+    def __init__(self, max_threads: int = 1024) -> None:
+        super().__init__()
+        self.max_threads = max_threads
+        self._thread_order: OrderedDict[str, None] = OrderedDict()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        self._thread_order[thread_id] = None
+        self._thread_order.move_to_end(thread_id)
+        while len(self._thread_order) > self.max_threads:
+            evicted, _ = self._thread_order.popitem(last=False)
+            super().delete_thread(evicted)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._thread_order.pop(thread_id, None)
+        super().delete_thread(thread_id)
+
+
+memory = BoundedMemorySaver()
+
+
+class AgentEvent(NamedTuple):
+    """One step of a customer-service run, as yielded by ``stream`` and returned by ``invoke``."""
+
+    content: str
+    is_task_complete: bool = False
+    require_user_input: bool = False
+    inventory_query: bool = False
 
 
 class ResponseFormat(BaseModel):
@@ -143,128 +210,157 @@ For all other requests within your capabilities:
 
 Always be helpful, professional, and concise."""
 
+    # Built once and shared by every instance; the graph prepends it to the history on each model call.
+    SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_INSTRUCTION)
+
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
 
+    # Tools are stateless, so every agent shares the same list.
+    tools = [
+        check_order_status,
+        get_store_hours,
+        process_return_request,
+    ]
+
+    # The compiled graph is shared across instances; per-conversation state is scoped by
+    # the ``thread_id`` in the run config, not by the graph object.
+    _model: ChatGoogleGenerativeAI | None = None
+    _bound_model: Any = None
+    _graph: Any = None
+
+    @classmethod
+    def _graph_singleton(cls) -> Any:
+        """Build the model and compile the graph on first use, then reuse them."""
+        if cls._graph is None:
+            cls._model = ChatGoogleGenerativeAI(
+                model="gemini-2.0-flash",
+                temperature=0.3,
+            )
+
+            # Bind the tool schemas once; create_react_agent reuses an already-bound model as-is.
+            cls._bound_model = cls._model.bind_tools(cls.tools)
+
+            cls._graph = create_react_agent(
+                cls._bound_model,
+                tools=cls.tools,
+                checkpointer=memory,
+                prompt=cls.SYSTEM_MESSAGE,
+                response_format=ResponseFormat,
+            )
+        return cls._graph
+
     def __init__(self) -> None:
-        self.model = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            temperature=0.3,
-        )
-        self.tools = [
-            check_order_status,
-            get_store_hours,
-            process_return_request,
-        ]
-
-        self.graph = create_react_agent(
-            self.model,
-            tools=self.tools,
-            checkpointer=memory,
-            prompt=self.SYSTEM_INSTRUCTION,
-            response_format=ResponseFormat,
-        )
+        self.graph = self._graph_singleton()
+        self.model = self._model
 
-    def invoke(self, query: str, session_id: str) -> dict[str, Any]:
+    def invoke(self, query: str, session_id: str) -> AgentEvent:
         """Invoke the agent synchronously."""
         config = {"configurable": {"thread_id": session_id}}
-        self.graph.invoke({"messages": [("user", query)]}, config)
-        return self.get_agent_response(config)
-
-    async def stream(self, query: str, session_id: str) -> AsyncIterable[dict[str, Any]]:
-        """Stream responses for the given query."""
+        values = self.graph.invoke({"messages": [HumanMessage(content=query)]}, config)
+        return self.get_agent_response(config, values)
+
+    async def abatch_invoke(self, items: list[tuple[str, str]], max_concurrency: int = 8) -> list[AgentEvent]:
+        """Invoke the agent for many ``(query, session_id)`` pairs concurrently.
+
+        Intended for evaluation and warm-up runs; ``max_concurrency`` workers share the
+        items, so at most that many graph runs are in flight at once. Results are returned
+        in input order.
+        """
+        results: dict[int, AgentEvent] = {}
+        pending = iter(enumerate(items))
+
+        async def _worker() -> None:
+            # Workers bound the batch; each run still takes a slot of the process-wide limit
+            for index, (query, session_id) in pending:
+                config = {"configurable": {"thread_id": session_id}}
+                async with _GEMINI_SEM:
+                    values = await self.graph.ainvoke({"messages": [HumanMessage(content=query)]}, config)
+                results[index] = self.get_agent_response(config, values)
+
+        await asyncio.gather(*(_worker() for _ in range(min(max_concurrency, len(items)))))
+        return [results[index] for index in range(len(items))]
+
+    async def stream(self, query: str, session_id: str) -> AsyncIterable[AgentEvent]:
+        """Stream responses for the given query.
+
+        Graph steps are many small awaits, so the server runs on uvloop where available
+        (uvicorn's ``loop="auto"`` picks it up once ``uvloop`` is installed).
+        """
         try:
-            logger.info(f"Customer service agent processing query: {query}")
+            logger.info("Customer service agent processing query: %s", query)
 
             # Yield initial status
-            yield {
-                "is_task_complete": False,
-                "require_user_input": False,
-                "content": "Processing your request...",
-            }
+            yield AgentEvent("Processing your request...")
 
-            inputs = {"messages": [("user", query)]}
+            inputs = {"messages": [HumanMessage(content=query)]}
             config = {"configurable": {"thread_id": session_id}}
 
-            # Stream through the graph execution
-            async for item in self.graph.astream(inputs, config, stream_mode="values"):
-                if "messages" not in item:
-                    continue
-
-                messages = item["messages"]
-                if not messages:
-                    continue
-
-                last_message = messages[-1]
-
-                # Handle tool calls
-                if (
-                    isinstance(last_message, AIMessage)
-                    and hasattr(last_message, "tool_calls")
-                    and last_message.tool_calls
-                    and len(last_message.tool_calls) > 0
-                ):
-                    for tool_call in last_message.tool_calls:
-                        yield {
-                            "is_task_complete": False,
-                            "require_user_input": False,
-                            "content": f"Looking up {tool_call['name'].replace('_', ' ')}...",
-                        }
-
-                # Handle tool responses
-                elif isinstance(last_message, ToolMessage):
-                    yield {
-                        "is_task_complete": False,
-                        "require_user_input": False,
-                        "content": "Processing information...",
-                    }
-
-            # Get the final response
-            yield self.get_agent_response(config)
+            # Stream per-node deltas rather than re-emitting the whole state on every step
+            final_values: dict[str, Any] | None = None
+            async with aclosing(self.graph.astream(inputs, config, stream_mode="updates")) as updates:
+                while True:
+                    # Take a Gemini slot per graph step, so a slow consumer never holds one
+                    async with _GEMINI_SEM:
+                        update = await anext(updates, None)
+                    if update is None:
+                        break
+
+                    for node_update in update.values():
+                        if not isinstance(node_update, dict):
+                            continue
+
+                        if "structured_response" in node_update:
+                            final_values = node_update
+
+                        messages = node_update.get("messages")
+                        if not messages:
+                            continue
+
+                        last_message = messages[-1]
+
+                        # Handle tool calls
+                        if isinstance(last_message, AIMessage) and last_message.tool_calls:
+                            for tool_call in last_message.tool_calls:
+                                yield AgentEvent(f"Looking up {tool_call['name'].replace('_', ' ')}...")
+
+                        # Handle tool responses
+                        elif isinstance(last_message, ToolMessage):
+                            yield AgentEvent("Processing information...")
+
+            # Get the final response; only read the checkpoint (async) if the stream did not carry it
+            if final_values is None:
+                final_values = (await self.graph.aget_state(config)).values
+            yield self.get_agent_response(config, final_values)
 
         except Exception as exc:
-            logger.error(f"Customer service stream error: {exc}", exc_info=True)
-            yield {
-                "is_task_complete": False,
-                "require_user_input": True,
-                "content": "I apologize, but I encountered an error processing your request. Please try again.",
-            }
-
-    def get_agent_response(self, config: dict[str, Any]) -> dict[str, Any]:
-        """Extract the final response from the agent state."""
-        current_state = self.graph.get_state(config)
-        structured_response = current_state.values.get("structured_response")
+            logger.error("Customer service stream error: %s", exc, exc_info=VERBOSE_ERRORS)
+            yield AgentEvent(
+                "I apologize, but I encountered an error processing your request. Please try again.",
+                require_user_input=True,
+            )
+
+    def get_agent_response(self, config: dict[str, Any], values: dict[str, Any] | None = None) -> AgentEvent:
+        """Extract the final response from the agent state.
+
+        ``values`` may be passed by async callers that already fetched the state.
+        """
+        if values is None:
+            values = self.graph.get_state(config).values
+        structured_response = values.get("structured_response")
 
         if structured_response and isinstance(structured_response, ResponseFormat):
             if structured_response.status == "input_required":
-                return {
-                    "is_task_complete": False,
-                    "require_user_input": True,
-                    "content": structured_response.message,
-                }
+                return AgentEvent(structured_response.message, require_user_input=True)
             elif structured_response.status == "error":
-                return {
-                    "is_task_complete": False,
-                    "require_user_input": True,
-                    "content": structured_response.message,
-                }
+                return AgentEvent(structured_response.message, require_user_input=True)
             elif structured_response.status == "inventory_query":
                 # This is a special case for inventory queries
-                return {
-                    "is_task_complete": False,
-                    "require_user_input": False,
-                    "inventory_query": True,
-                    "content": structured_response.message,
-                }
+                return AgentEvent(structured_response.message, inventory_query=True)
             elif structured_response.status == "completed":
-                return {
-                    "is_task_complete": True,
-                    "require_user_input": False,
-                    "content": structured_response.message,
-                }
+                return AgentEvent(structured_response.message, is_task_complete=True)
 
         # Fallback response
-        return {
-            "is_task_complete": False,
-            "require_user_input": True,
-            "content": "I apologize, but I was unable to process your request. Please try again or provide more information.",
-        }
+        return AgentEvent(
+            "I apologize, but I was unable to process your request. Please try again or provide more information.",
+            require_user_input=True,
+        )
@@ -1,3 +1,4 @@
+import functools
 import logging
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
@@ -5,28 +6,36 @@ from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import (
     InvalidParamsError,
-    Part,
     Task,
     TaskState,
-    TextPart,
     UnsupportedOperationError,
 )
-from a2a.utils import (
-    new_agent_text_message,
-    new_task,
-)
+from a2a.utils import new_task
 from a2a.utils.errors import ServerError
 
-from .agent import CustomerServiceAgent
+from backend.utils.a2a_messages import agent_message, agent_text_message, text_part
+from backend.utils.error_logging import VERBOSE_ERRORS
+from backend.utils.singleton import LazySingleton
+from backend.utils.status_coalescer import StatusCoalescer
+
+from .agent import INVENTORY_ROUTING_MESSAGE, CustomerServiceAgent
 
 logger = logging.getLogger(__name__)
 
 
+# The routing hint never changes and parts are never mutated, so one Part is shared by every hint message.
+_INVENTORY_ROUTING_PART = text_part(INVENTORY_ROUTING_MESSAGE)
+
+
+# The process-wide agent, created on first use
+_get_agent = LazySingleton(CustomerServiceAgent).get
+
+
 class CustomerServiceAgentExecutor(AgentExecutor):
     """Customer Service Agent Executor for A2A Protocol."""
 
     def __init__(self):
-        self.agent = CustomerServiceAgent()
+        self.agent = _get_agent()
 
     async def execute(
         self,
@@ -35,10 +44,10 @@ class CustomerServiceAgentExecutor(AgentExecutor):
     ) -> None:
         """Execute customer service agent request."""
         # Validate request
-        if not context.message or not context.get_user_input():
+        query = context.get_user_input()
+        if not context.message or not query or not query.strip():
             raise ServerError(error=InvalidParamsError())
 
-        query = context.get_user_input()
         task = context.current_task
 
         # Create new task if none exists
@@ -47,6 +56,8 @@ class CustomerServiceAgentExecutor(AgentExecutor):
             event_queue.enqueue_event(task)
 
         updater = TaskUpdater(event_queue, task.id, task.contextId)
+        make_msg = functools.partial(agent_text_message, context_id=task.contextId, task_id=task.id)
+        status = StatusCoalescer(updater, make_msg)
 
         try:
             # Start working
@@ -54,44 +65,29 @@ class CustomerServiceAgentExecutor(AgentExecutor):
 
             # Execute agent logic
             async for item in self.agent.stream(query, task.contextId):
-                is_task_complete = item.get("is_task_complete", False)
-                require_user_input = item.get("require_user_input", False)
-                inventory_query = item.get("inventory_query", False)
-                content = item.get("content", "")
+                content, is_task_complete, require_user_input, inventory_query = item
 
-                if not is_task_complete and not require_user_input:
-                    # Working state - update status
-                    updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            content,
-                            task.contextId,
-                            task.id,
-                        ),
-                    )
+                if is_task_complete or require_user_input or inventory_query:
+                    status.discard()
 
-                elif require_user_input:
-                    # Need more input from user
+                if inventory_query:
+                    # This is an inventory query - indicate it should be routed
                     updater.update_status(
-                        TaskState.input_required,
-                        new_agent_text_message(
-                            content,
-                            task.contextId,
-                            task.id,
-                        ),
+                        TaskState.failed,
+                        agent_message(_INVENTORY_ROUTING_PART, task.contextId, task.id),
                         final=True,
                     )
                     break
 
-                elif inventory_query:
-                    # This is an inventory query - indicate it should be routed
+                elif not is_task_complete and not require_user_input:
+                    # Working state - coalesce status updates
+                    status.push(content)
+
+                elif require_user_input:
+                    # Need more input from user
                     updater.update_status(
-                        TaskState.failed,
-                        new_agent_text_message(
-                            "I need to check our inventory system for product availability. Please ask the host agent to route your query to the inventory agent.",
-                            task.contextId,
-                            task.id,
-                        ),
+                        TaskState.input_required,
+                        make_msg(content),
                         final=True,
                     )
                     break
@@ -99,21 +95,19 @@ class CustomerServiceAgentExecutor(AgentExecutor):
                 else:
                     # Task completed successfully
                     updater.add_artifact(
-                        [Part(root=TextPart(text=content))],
+                        [text_part(content)],
                         name="customer_service_response",
                     )
                     updater.complete()
                     break
 
         except Exception as e:
-            logger.error(f"Error executing customer service agent: {e}", exc_info=True)
-            updater.failed(
-                new_agent_text_message(
-                    f"I apologize, but I encountered an error: {str(e)}",
-                    task.contextId,
-                    task.id,
-                )
-            )
+            status.discard()
+            logger.error("Error executing customer service agent: %s", e, exc_info=VERBOSE_ERRORS)
+            updater.failed(make_msg(f"I apologize, but I encountered an error: {str(e)}"))
+        finally:
+            # Don't leave a timer running past the end of the request
+            status.flush()
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> Task | None:
         """Cancel a task - not supported for this agent."""
@@ -3,19 +3,22 @@ import os
 import click
 from dotenv import load_dotenv
 
-from a2a.server.apps import A2AStarletteApplication
+# Load .env before the agent modules are imported: they read their tuning knobs at import time
+load_dotenv()
+
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
 )
 
+from backend.utils.a2a_server import FastA2AStarletteApplication
+from backend.utils.task_store import DEFAULT_TASK_STORE_SIZE, LruTaskStore
+
 from .agent import CustomerServiceAgent
 from .agent_executor import CustomerServiceAgentExecutor
 
-load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -29,7 +32,13 @@ class MissingAPIKeyError(Exception):
 @click.command()
 @click.option("--host", default="0.0.0.0", help="Host to run the server on")
 @click.option("--port", default=8002, help="Port to run the server on")
-def main(host: str, port: int):
+@click.option(
+    "--task-store-size",
+    default=DEFAULT_TASK_STORE_SIZE,
+    type=click.IntRange(min=1),
+    help="Maximum number of tasks kept in memory",
+)
+def main(host: str, port: int, task_store_size: int):
     """Start the Customer Service Agent A2A server."""
     try:
         # Check for API key
@@ -69,11 +78,11 @@ def main(host: str, port: int):
         # Create request handler
         request_handler = DefaultRequestHandler(
             agent_executor=CustomerServiceAgentExecutor(),
-            task_store=InMemoryTaskStore(),
+            task_store=LruTaskStore(task_store_size),
         )
 
-        # Create A2A server
-        server = A2AStarletteApplication(
+        # Create A2A server; the agent card is serialized once and served as bytes
+        server = FastA2AStarletteApplication(
             agent_card=agent_card,
             http_handler=request_handler,
         )
@@ -81,8 +90,22 @@ def main(host: str, port: int):
         # Start server
         import uvicorn
 
+        # Prefer the libuv loop and C HTTP parser; fall back to stdlib asyncio (e.g. on Windows)
+        try:
+            import uvloop  # noqa: F401
+
+            loop_kind = "uvloop"
+        except ImportError:
+            loop_kind = "asyncio"
+        try:
+            import httptools  # noqa: F401
+
+            http_kind = "httptools"
+        except ImportError:
+            http_kind = "h11"
+
         logger.info(f"Starting Customer Service Agent on http://{host}:{port}")
-        uvicorn.run(server.build(), host=host, port=port)
+        uvicorn.run(server.build(), host=host, port=port, loop=loop_kind, http=http_kind, log_level="info")
 
     except MissingAPIKeyError as e:
         logger.error(f"Error: {e}")
@@ -1,13 +1,20 @@
 import asyncio
 import logging
+import operator
+import os
+import re
+import time
 import uuid
+from collections import OrderedDict
+from contextlib import aclosing
 from typing import Any
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Awaitable
 
 import httpx
-from a2a.client import A2AClient
+from a2a.client import A2AClient, A2AClientError
 from a2a.types import (
     AgentCard,
+    JSONRPCErrorResponse,
     Message,
     Part,
     Role,
@@ -25,18 +32,198 @@ from google.adk.runners import Runner
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
 from google.genai import types
 
+from backend.utils.error_logging import VERBOSE_ERRORS
+from backend.utils.session_cache import SessionCache
+from backend.utils.stream_events import StreamEvent
+
 logger = logging.getLogger(__name__)
 
 
+# Caps concurrent outbound A2A sends so request bursts queue here instead of
+# exhausting the connection pool and retrying against busy remote agents.
+_A2A_SEM = asyncio.Semaphore(int(os.getenv("HOST_A2A_CONCURRENCY", "32")))
+
+# Per-phase limits: connections are kept alive, so a slow connect or a wait for a pooled
+# connection means the agent is in trouble and should fail fast instead of using the full 30s.
+_A2A_TIMEOUT = httpx.Timeout(30.0, connect=2.0, read=30.0, write=5.0, pool=1.0)
+
+# Cheap pre-classifier for speculative dispatch: a query that mentions inventory topics
+# and nothing order/service related is almost always routed to the inventory agent.
+_INVENTORY_HINT_RE = re.compile(
+    r"\b(?:in stock|stock|inventory|available|availability|products?|prices?|cheapest|search|find|show me)\b",
+    re.IGNORECASE,
+)
+_SERVICE_HINT_RE = re.compile(
+    r"\b(?:orders?|ord-\w+|returns?|refunds?|exchange|hours|open|close|tracking|shipp(?:ed|ing)|complaint|polic(?:y|ies)|purchase)\b",
+    re.IGNORECASE,
+)
+
+
+# Failures expected from a remote agent being down, slow or unhappy; anything else is a bug
+# here and gets a full traceback.
+_EXPECTED_A2A_ERRORS = (A2AClientError, httpx.HTTPError, TimeoutError, ConnectionError)
+
+# Every outbound message asks for plain text; validated once and never mutated.
+_SEND_CONFIGURATION = MessageSendConfiguration(acceptedOutputModes=["text/plain", "text"])
+
+# The router model answers with one of these tokens; the label selects the stream handler.
+_ROUTE_RE = re.compile(r"ROUTE_TO_(BOTH|INVENTORY|CUSTOMER_SERVICE)")
+
+
+def _likely_inventory_only(query: str) -> bool:
+    return bool(_INVENTORY_HINT_RE.search(query)) and not _SERVICE_HINT_RE.search(query)
+
+
+# Phrases specific enough to settle routing without the router model, each paired with the
+# other domain's hints: a query that also touches the other domain still goes to the model.
+_FAST_ROUTES = (
+    (
+        re.compile(
+            r"\b(?:ord-\d+|order (?:#|id|number|status)|tracking (?:number|info)|store hours|return policy)\b",
+            re.IGNORECASE,
+        ),
+        "CUSTOMER_SERVICE",
+        _INVENTORY_HINT_RE,
+    ),
+    (re.compile(r"\b(?:in stock|how much|price of|prices? for)\b", re.IGNORECASE), "INVENTORY", _SERVICE_HINT_RE),
+)
+_BOTH_HINT_RE = re.compile(r"\b(?:and also|as well as|plus)\b", re.IGNORECASE)
+
+
+def _fast_route(query: str) -> str | None:
+    """Return the routing label for a query that clearly belongs to one agent, else None."""
+    if _BOTH_HINT_RE.search(query):
+        return None
+    labels = [
+        label for pattern, label, conflict in _FAST_ROUTES if pattern.search(query) and not conflict.search(query)
+    ]
+    return labels[0] if len(labels) == 1 else None
+
+
+async def _error_as_text(agent: str, call: Awaitable[str]) -> str:
+    """Await an agent call, turning a failure into the error text shown in combined answers."""
+    try:
+        return await call
+    except Exception as exc:
+        return f"Error from {agent.replace('_', ' ')} agent: {str(exc)}"
+
+
+def _user_content(text: str) -> types.Content:
+    """Build a user turn without pydantic validation; Part.from_text does no normalization."""
+    return types.Content.model_construct(role="user", parts=[types.Part.model_construct(text=text)])
+
+
+_UNWRAP_RESULT = operator.attrgetter("root.result")
+
+
+def _unwrap_result(response: Any) -> Any:
+    """Return the payload of a send_message response; bare results are passed through."""
+    try:
+        return _UNWRAP_RESULT(response)
+    except AttributeError:
+        root = getattr(response, "root", response)
+        return getattr(root, "result", root)
+
+
+def _extract_from_task(task: Task) -> str:
+    if task.artifacts:
+        texts = [
+            part.root.text
+            for artifact in task.artifacts
+            for part in artifact.parts
+            if getattr(part, "root", None) and getattr(part.root, "text", None)
+        ]
+        return "\n".join(texts) if texts else "Task completed with no text response"
+    if task.status and task.status.message:
+        return get_message_text(task.status.message)
+    return f"Task {task.id} status: {task.status.state if task.status else 'unknown'}"
+
+
+def _raise_agent_error(response: JSONRPCErrorResponse) -> str:
+    # Raised rather than returned so the error text is never cached as an answer
+    raise A2AClientError(f"agent returned error {response.error.code}: {response.error.message}")
+
+
+def _extract_from_unknown(result: Any) -> str:
+    logger.warning("Unexpected response type: %s", type(result))
+    return "Received response but unable to extract text"
+
+
+# Response payload type -> text extractor
+_RESULT_HANDLERS = {
+    Task: _extract_from_task,
+    Message: get_message_text,
+    JSONRPCErrorResponse: _raise_agent_error,
+}
+
+
 class HostAgent:
     """Coordinates between Inventory and Customer Service agents with support for parallel invocation."""
 
+    ROUTING_INSTRUCTION = """You are a host agent that coordinates between specialized retail agents.
+
+Your role is to analyze incoming queries and determine the best routing strategy.
+
+Available agents and their capabilities:
+
+**Customer Service Agent**: Handles order status, returns, refunds, complaints, store hours, policies, shipping issues
+**Inventory Agent**: Handles product searches, stock availability, pricing, categories, product recommendations
+
+Analyze the user's query and respond with ONLY one of these routing decisions:
+
+1. "ROUTE_TO_CUSTOMER_SERVICE" - Use when the query is about:
+   - Order status or tracking
+   - Returns or refunds  
+   - Store hours or policies
+   - Complaints or issues with orders
+   - Any query mentioning an order ID
+   - Questions about "my order" or "my purchase"
+
+2. "ROUTE_TO_INVENTORY" - Use when the query is about:
+   - Product availability or stock
+   - Product searches or recommendations
+   - Pricing information
+   - Product categories or specifications
+   - Finding alternatives or similar products (without order context)
+
+3. "ROUTE_TO_BOTH" - Use ONLY when the query explicitly requires both agents:
+   - User asks to check order status AND find alternative products
+   - User wants to return something AND needs help finding a replacement
+   - Query contains "and also" or similar phrases connecting both domains
+
+Important guidelines:
+- If someone wants to return a product from an order, that's CUSTOMER SERVICE only
+- Just mentioning a product name in an order/return context doesn't require inventory lookup
+- Default to single agent routing unless there's a clear need for both
+- When in doubt about order-related queries, choose CUSTOMER SERVICE"""
+
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
 
     # Agent URLs
     INVENTORY_AGENT_URL = "http://localhost:8001"
     CUSTOMER_SERVICE_AGENT_URL = "http://localhost:8002"
 
+    # Sessions kept in the local fast-path cache in front of the session service
+    SESSION_CACHE_SIZE = 1024
+
+    # Seconds a get_agent_status result is reused before the agents are probed again
+    STATUS_TTL = 2.0
+
+    # Seconds a fetched agent card (or a failed fetch) is trusted before asking again
+    CARD_TTL = 300.0
+    CARD_NEGATIVE_TTL = 5.0
+
+    # Agents whose answers are safe to reuse: inventory lookups are read-only searches
+    CACHEABLE_AGENT_URLS = frozenset({INVENTORY_AGENT_URL})
+    RESPONSE_CACHE_TTL = 30.0
+    RESPONSE_CACHE_SIZE = 1024
+
+    # Upper bound in seconds on one A2A send, however the time splits across HTTP phases
+    A2A_CALL_TIMEOUT = 25.0
+
+    # Routing decisions remembered per session, so repeating a question skips the router model
+    ROUTE_CACHE_SIZE = 1024
+
     def __init__(self) -> None:
         self._agent = self._build_agent()
         self._user_id = "host_agent_user"
@@ -47,89 +234,179 @@ class HostAgent:
             session_service=InMemorySessionService(),
             memory_service=InMemoryMemoryService(),
         )
-        self._agent_cards: dict[str, AgentCard] = {}
+        self._sessions = SessionCache(
+            self._runner.session_service, self._agent.name, self._user_id, self.SESSION_CACHE_SIZE
+        )
+        # agent_url -> (card or None for a failed fetch, monotonic expiry)
+        self._agent_cards: dict[str, tuple[AgentCard | None, float]] = {}
+        self._httpx_client: httpx.AsyncClient | None = None
+        self._status_cache: tuple[float, str] | None = None
+        self._status_lock = asyncio.Lock()
+        self._response_cache: OrderedDict[tuple[str, str, str], tuple[str, float]] = OrderedDict()
+        self._inflight: dict[tuple[str, str, str], asyncio.Future[str]] = {}
+        # in-flight call -> number of callers still awaiting it
+        self._inflight_waiters: dict[asyncio.Future[str], int] = {}
+        self._route_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+
+    def _get_httpx_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client shared by all outbound A2A calls."""
+        if self._httpx_client is None or self._httpx_client.is_closed:
+            # Limits go on the transport: httpx ignores client-level limits when a transport is given.
+            # HTTP/1.1 on purpose: uvicorn serves the agents without HTTP/2 (no h2c), and parallel
+            # calls already run on separate pooled keep-alive connections, so nothing queues behind another.
+            self._httpx_client = httpx.AsyncClient(
+                timeout=_A2A_TIMEOUT,
+                transport=httpx.AsyncHTTPTransport(
+                    retries=1,
+                    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                ),
+            )
+        return self._httpx_client
+
+    async def warmup(self) -> None:
+        """Fetch both agent cards up front so the first query skips the cold GETs.
+
+        The fetches go through the pooled client, which also leaves a keep-alive
+        connection open to each agent. Agents that are not up yet are simply retried
+        on first use.
+        """
+        await asyncio.gather(
+            self._get_agent_card(self.INVENTORY_AGENT_URL),
+            self._get_agent_card(self.CUSTOMER_SERVICE_AGENT_URL),
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
+            self._httpx_client = None
 
     async def _get_agent_card(self, agent_url: str) -> AgentCard | None:
-        """Get and cache agent card."""
-        if agent_url not in self._agent_cards:
-            try:
-                logger.info(f"Fetching agent card from {agent_url}")
-                async with httpx.AsyncClient() as hc:
-                    # Fetch the agent card JSON directly
-                    response = await hc.get(f"{agent_url}/.well-known/agent.json")
-                    response.raise_for_status()
-                    logger.info(f"Direct GET to {agent_url}: {response.status_code}")
-
-                    # Parse the agent card
-                    agent_card = AgentCard(**response.json())
-                    self._agent_cards[agent_url] = agent_card
-                    logger.info(f"Successfully cached agent card for {agent_url}: {agent_card.name}")
-                    return agent_card
-            except Exception as e:
-                logger.error(f"Failed to get agent card from {agent_url}: {e}", exc_info=True)
-                return None
-        return self._agent_cards.get(agent_url)
+        """Get and cache agent card.
 
-    async def _call_agent_with_a2a(self, agent_url: str, query: str, context_id: str) -> str:
-        """Call an agent using the A2A protocol."""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as hc:
-                # Get the A2A client
-                client = await A2AClient.get_client_from_agent_card_url(httpx_client=hc, base_url=agent_url)
-
-                # Create message
-                message = Message(
-                    messageId=str(uuid.uuid4()),
-                    contextId=context_id,
-                    role=Role.user,
-                    parts=[Part(root=TextPart(text=query))],
-                )
+        Successful fetches are cached for ``CARD_TTL`` so restarted agents are picked up;
+        failures are cached for ``CARD_NEGATIVE_TTL`` so an outage doesn't cost a
+        connection attempt on every request.
+        """
+        cached = self._agent_cards.get(agent_url)
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
 
-                # Create request with configuration AND ID
-                request = SendMessageRequest(
-                    id=str(uuid.uuid4()),  # Add the required id field
-                    params=MessageSendParams(
-                        message=message,
-                        configuration=MessageSendConfiguration(acceptedOutputModes=["text/plain", "text"]),
-                    ),
-                )
+        try:
+            logger.info("Fetching agent card from %s", agent_url)
+            # Fetch the agent card JSON directly
+            response = await self._get_httpx_client().get(f"{agent_url}/.well-known/agent.json", timeout=5.0)
+            response.raise_for_status()
+            logger.debug("Direct GET to %s: %s", agent_url, response.status_code)
+
+            # Parse the agent card
+            agent_card = AgentCard(**response.json())
+            self._agent_cards[agent_url] = (agent_card, time.monotonic() + self.CARD_TTL)
+            logger.info("Successfully cached agent card for %s: %s", agent_url, agent_card.name)
+            return agent_card
+        except Exception as e:
+            logger.error("Failed to get agent card from %s: %s", agent_url, e, exc_info=VERBOSE_ERRORS)
+            self._agent_cards[agent_url] = (None, time.monotonic() + self.CARD_NEGATIVE_TTL)
+            return None
 
-                # Send message
-                response = await client.send_message(request)
+    async def _call_agent_with_a2a(self, agent_url: str, query: str, context_id: str) -> str:
+        """Call an agent using the A2A protocol.
+
+        Answers from read-only agents (``CACHEABLE_AGENT_URLS``) are cached per
+        ``(agent, context, query)`` for ``RESPONSE_CACHE_TTL`` seconds, and identical
+        concurrent calls share a single in-flight request. Failures are never cached.
+        The shared request is cancelled once every caller waiting on it has been cancelled.
+        """
+        if agent_url not in self.CACHEABLE_AGENT_URLS:
+            try:
+                return await self._send_to_agent(agent_url, query, context_id)
+            except Exception as e:
+                return self._agent_call_failed(agent_url, e)
+
+        key = (agent_url, context_id, query)
+        cached = self._response_cache.get(key)
+        if cached is not None and time.monotonic() < cached[1]:
+            self._response_cache.move_to_end(key)
+            return cached[0]
+
+        call = self._inflight.get(key)
+        if call is None:
+            call = asyncio.ensure_future(self._send_to_agent(agent_url, query, context_id))
+            self._inflight[key] = call
+            call.add_done_callback(lambda done: self._finish_inflight(key, done))
+
+        waiters = self._inflight_waiters
+        waiters[call] = waiters.get(call, 0) + 1
+        try:
+            # Shield the shared call so one cancelled caller doesn't fail the others
+            response = await asyncio.shield(call)
+        except asyncio.CancelledError:
+            # Nobody else wants the answer (e.g. a dropped speculative call): stop the send too
+            if waiters[call] == 1:
+                call.cancel()
+            raise
+        except Exception as e:
+            return self._agent_call_failed(agent_url, e)
+        finally:
+            waiters[call] -= 1
+            if not waiters[call]:
+                del waiters[call]
+
+        self._response_cache[key] = (response, time.monotonic() + self.RESPONSE_CACHE_TTL)
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+        return response
+
+    @staticmethod
+    def _agent_call_failed(agent_url: str, exc: Exception) -> str:
+        """Log a failed agent call and turn it into the user-facing error text.
+
+        Cancellation is a BaseException, so it is never routed here and propagates as is.
+        """
+        if isinstance(exc, _EXPECTED_A2A_ERRORS):
+            logger.warning("Error calling agent at %s: %s", agent_url, exc, exc_info=VERBOSE_ERRORS)
+        else:
+            logger.error("Unexpected error calling agent at %s", agent_url, exc_info=exc)
+        return f"Error communicating with agent: {str(exc)}"
+
+    def _finish_inflight(self, key: tuple[str, str, str], call: asyncio.Future[str]) -> None:
+        self._inflight.pop(key, None)
+        # Mark a failure as retrieved even if every waiter was cancelled before it landed
+        if not call.cancelled():
+            call.exception()
+
+    async def _send_to_agent(self, agent_url: str, query: str, context_id: str) -> str:
+        """Send one A2A message and extract the response text; raises on failure."""
+        # Build the client from the cached card instead of re-fetching it for every call
+        agent_card = await self._get_agent_card(agent_url)
+        if agent_card is None:
+            raise ConnectionError(f"agent at {agent_url} is unavailable")
+        client = A2AClient(httpx_client=self._get_httpx_client(), agent_card=agent_card)
+
+        # Create message; every field is built here, so skip pydantic validation
+        message = Message.model_construct(
+            messageId=uuid.uuid4().hex,
+            contextId=context_id,
+            role=Role.user,
+            parts=[Part.model_construct(root=TextPart.model_construct(text=query))],
+        )
 
-                # Extract response
-                if hasattr(response, "root"):
-                    result = response.root.result
-                else:
-                    result = response.result if hasattr(response, "result") else response
-
-                # Handle different response types
-                if isinstance(result, Task):
-                    # Task response
-                    if result.artifacts:
-                        # Extract text from artifacts
-                        texts = []
-                        for artifact in result.artifacts:
-                            for part in artifact.parts:
-                                if hasattr(part, "root") and hasattr(part.root, "text"):
-                                    texts.append(part.root.text)
-                        return "\n".join(texts) if texts else "Task completed with no text response"
-                    elif result.status and result.status.message:
-                        return get_message_text(result.status.message)
-                    else:
-                        return f"Task {result.id} status: {result.status.state if result.status else 'unknown'}"
-
-                elif isinstance(result, Message):
-                    # Direct message response
-                    return get_message_text(result)
+        # Create request with configuration AND ID; the configuration is the shared pre-validated one
+        request = SendMessageRequest.model_construct(
+            id=uuid.uuid4().hex,  # Add the required id field
+            params=MessageSendParams.model_construct(message=message, configuration=_SEND_CONFIGURATION),
+        )
 
-                else:
-                    logger.warning(f"Unexpected response type: {type(result)}")
-                    return "Received response but unable to extract text"
+        # Send message
+        async with _A2A_SEM:
+            try:
+                response = await asyncio.wait_for(client.send_message(request), timeout=self.A2A_CALL_TIMEOUT)
+            except TimeoutError:
+                raise TimeoutError(f"agent at {agent_url} did not answer within {self.A2A_CALL_TIMEOUT}s") from None
 
-        except Exception as e:
-            logger.error(f"Error calling agent at {agent_url}: {e}", exc_info=True)
-            return f"Error communicating with agent: {str(e)}"
+        result = _unwrap_result(response)
+        return _RESULT_HANDLERS.get(type(result), _extract_from_unknown)(result)
 
     async def call_customer_service_agent(self, query: str, context_id: str) -> str:
         """Forward query to Customer Service Agent over A2A."""
@@ -145,34 +422,70 @@ class HostAgent:
         """Call both agents in parallel and return their responses."""
         logger.info("Executing parallel agent calls")
 
-        # Create tasks for parallel execution
-        inventory_task = asyncio.create_task(self.call_inventory_agent(inventory_query, context_id))
-        customer_service_task = asyncio.create_task(
-            self.call_customer_service_agent(customer_service_query, context_id)
-        )
+        async with aclosing(
+            self._call_agents_as_completed(inventory_query, customer_service_query, context_id)
+        ) as responses:
+            return {agent: response async for agent, response in responses}
+
+    async def _call_agents_as_completed(
+        self,
+        inventory_query: str,
+        customer_service_query: str,
+        context_id: str,
+        inventory_task: asyncio.Task[str] | None = None,
+    ) -> AsyncIterable[tuple[str, str]]:
+        """Call both agents in parallel and yield ``(agent, response)`` in completion order.
+
+        ``inventory_task`` lets an already running (speculative) inventory call be reused.
+        Failures come back as error text; closing the iterator early cancels both calls.
+        """
+
+        async def _labelled(agent: str, call: Awaitable[str]) -> tuple[str, str]:
+            return agent, await _error_as_text(agent, call)
+
+        tasks = [
+            asyncio.ensure_future(
+                _labelled("inventory", inventory_task or self.call_inventory_agent(inventory_query, context_id))
+            ),
+            asyncio.ensure_future(
+                _labelled("customer_service", self.call_customer_service_agent(customer_service_query, context_id))
+            ),
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
 
-        # Wait for both tasks to complete
-        inventory_response, customer_service_response = await asyncio.gather(
-            inventory_task, customer_service_task, return_exceptions=True
-        )
+    async def get_agent_status(self) -> str:
+        """Return online/offline status for remote agents.
 
-        # Handle any exceptions
-        if isinstance(inventory_response, Exception):
-            inventory_response = f"Error from inventory agent: {str(inventory_response)}"
-        if isinstance(customer_service_response, Exception):
-            customer_service_response = f"Error from customer service agent: {str(customer_service_response)}"
+        Results are reused for ``STATUS_TTL`` seconds and concurrent callers share one probe,
+        so a polling UI can't multiply outbound requests.
+        """
+        if self._status_cache and time.monotonic() - self._status_cache[0] < self.STATUS_TTL:
+            return self._status_cache[1]
 
-        return {"inventory": inventory_response, "customer_service": customer_service_response}
+        async with self._status_lock:
+            # Another caller may have refreshed the status while we waited for the lock
+            if self._status_cache and time.monotonic() - self._status_cache[0] < self.STATUS_TTL:
+                return self._status_cache[1]
 
-    async def get_agent_status(self) -> str:
-        """Return online/offline status for remote agents."""
-        lines = ["Agent Status:"]
+            status = await self._probe_agent_status()
+            self._status_cache = (time.monotonic(), status)
+            return status
 
-        for name, url in [
+    async def _probe_agent_status(self) -> str:
+        agents = [
             ("Inventory Agent", self.INVENTORY_AGENT_URL),
             ("Customer Service Agent", self.CUSTOMER_SERVICE_AGENT_URL),
-        ]:
-            card = await self._get_agent_card(url)
+        ]
+        # Probe every agent concurrently; _get_agent_card already turns failures into None
+        cards = await asyncio.gather(*(self._get_agent_card(url) for _, url in agents))
+
+        lines = ["Agent Status:"]
+        for (name, _), card in zip(agents, cards, strict=True):
             if card:
                 lines.append(f"✅ {name}: Online - {card.description}")
             else:
@@ -185,118 +498,140 @@ class HostAgent:
             name="host_agent",
             model="gemini-2.0-flash",
             description="Host agent orchestrating retail queries between specialized agents with parallel execution support.",
-            instruction=(
-                """You are a host agent that coordinates between specialized retail agents.
-
-Your role is to analyze incoming queries and determine the best routing strategy.
-
-Available agents and their capabilities:
-
-**Customer Service Agent**: Handles order status, returns, refunds, complaints, store hours, policies, shipping issues
-**Inventory Agent**: Handles product searches, stock availability, pricing, categories, product recommendations
-
-Analyze the user's query and respond with ONLY one of these routing decisions:
-
-1. "ROUTE_TO_CUSTOMER_SERVICE" - Use when the query is about:
-   - Order status or tracking
-   - Returns or refunds  
-   - Store hours or policies
-   - Complaints or issues with orders
-   - Any query mentioning an order ID
-   - Questions about "my order" or "my purchase"
-
-2. "ROUTE_TO_INVENTORY" - Use when the query is about:
-   - Product availability or stock
-   - Product searches or recommendations
-   - Pricing information
-   - Product categories or specifications
-   - Finding alternatives or similar products (without order context)
-
-3. "ROUTE_TO_BOTH" - Use ONLY when the query explicitly requires both agents:
-   - User asks to check order status AND find alternative products
-   - User wants to return something AND needs help finding a replacement
-   - Query contains "and also" or similar phrases connecting both domains
-
-Important guidelines:
-- If someone wants to return a product from an order, that's CUSTOMER SERVICE only
-- Just mentioning a product name in an order/return context doesn't require inventory lookup
-- Default to single agent routing unless there's a clear need for both
-- When in doubt about order-related queries, choose CUSTOMER SERVICE"""
-            ),
+            instruction=self.ROUTING_INSTRUCTION,
             tools=[],  # No tools - the agent uses its understanding to route
         )
 
-    async def stream(self, query: str, session_id: str) -> AsyncIterable[dict[str, Any]]:
-        """Stream responses for the given query."""
+    async def stream(self, query: str, session_id: str) -> AsyncIterable[StreamEvent]:
+        """Stream responses for the given query.
+
+        Inventory lookups are read-only, so when the query looks inventory-only the call to
+        the inventory agent starts while the router model is still deciding; it is used if
+        the router agrees and cancelled otherwise.
+        """
+        speculative: asyncio.Task[str] | None = None
         try:
-            logger.info(f"Host agent received query: {query}")
+            logger.info("Host agent received query: %s", query)
 
-            # Get or create session
-            session = await self._runner.session_service.get_session(
-                app_name=self._agent.name,
-                user_id=self._user_id,
-                session_id=session_id,
-            )
-            if session is None:
-                session = await self._runner.session_service.create_session(
-                    app_name=self._agent.name,
-                    user_id=self._user_id,
-                    state={},
-                    session_id=session_id,
-                )
+            session = await self._sessions.get_or_create(session_id)
 
             # Use session_id as context_id for consistency
             context_id = session_id
 
-            # Check agent status first
-            inventory_card = await self._get_agent_card(self.INVENTORY_AGENT_URL)
-            customer_service_card = await self._get_agent_card(self.CUSTOMER_SERVICE_AGENT_URL)
-
-            # Yield initial status
-            yield {"type": "status", "message": "Analyzing your request..."}
-
-            # Create content for the agent to analyze
-            content = types.Content(role="user", parts=[types.Part.from_text(text=f"Query: {query}")])
-
-            # Run the agent to determine routing
-            routing_decision = None
-            async for event in self._runner.run_async(
-                user_id=self._user_id,
-                session_id=session.id,
-                new_message=content,
-            ):
-                if event.is_final_response() and event.content and event.content.parts:
-                    routing_decision = "\n".join(p.text for p in event.content.parts if p.text)
-                    logger.info(f"Routing decision: {routing_decision}")
-                    break
-
-            if not routing_decision:
-                yield {"type": "error", "message": "Unable to determine routing"}
+            # Check agent status while the router model decides; the cards are only needed afterwards
+            cards = asyncio.gather(
+                self._get_agent_card(self.INVENTORY_AGENT_URL),
+                self._get_agent_card(self.CUSTOMER_SERVICE_AGENT_URL),
+            )
+            route_key = (session_id, " ".join(query.lower().split()))
+            route = self._route_cache.get(route_key)
+            try:
+                # Yield initial status
+                yield StreamEvent("status", message="Analyzing your request...")
+
+                if route is not None:
+                    self._route_cache.move_to_end(route_key)
+                    logger.info("Routing decision (cached): ROUTE_TO_%s", route)
+                elif (route := _fast_route(query)) is not None:
+                    logger.info("Routing decision (keyword): ROUTE_TO_%s", route)
+                else:
+                    # Only a router model call leaves time worth overlapping with a speculative send
+                    if _likely_inventory_only(query):
+                        speculative = asyncio.create_task(self.call_inventory_agent(query, context_id))
+
+                    # Create content for the agent to analyze
+                    content = _user_content(f"Query: {query}")
+
+                    # Run the agent to determine routing; close the run as soon as the decision is
+                    # in rather than leaving the abandoned generator to be finalized by the GC
+                    routing_decision = None
+                    async with aclosing(
+                        self._runner.run_async(
+                            user_id=self._user_id,
+                            session_id=session.id,
+                            new_message=content,
+                        )
+                    ) as events:
+                        async for event in events:
+                            if event.is_final_response() and event.content and event.content.parts:
+                                routing_decision = "\n".join(p.text for p in event.content.parts if p.text)
+                                logger.debug("Routing decision: %s", routing_decision)
+                                break
+
+                    if not routing_decision:
+                        yield StreamEvent("error", message="Unable to determine routing")
+                        return
+
+                    match = _ROUTE_RE.search(routing_decision)
+                    if match:
+                        route = match.group(1)
+                        logger.info("Routing decision: ROUTE_TO_%s", route)
+                        self._route_cache[route_key] = route
+                        if len(self._route_cache) > self.ROUTE_CACHE_SIZE:
+                            self._route_cache.popitem(last=False)
+            finally:
+                # No usable routing decision (or the stream was closed): the card checks are not needed
+                if route is None:
+                    cards.cancel()
+
+            # Drop the speculative call as soon as it can't be used: left running beside the chosen
+            # agent it would still be cached and land in the inventory agent's session history
+            if speculative is not None and route not in ("INVENTORY", "BOTH"):
+                speculative.cancel()
+                speculative = None
+
+            handler = self._ROUTE_HANDLERS.get(route)
+            if handler is None:
+                # Could not determine routing
+                yield StreamEvent(
+                    "error",
+                    message="I couldn't determine which agent should handle your request. Please try rephrasing your question.",
+                )
                 return
 
-            # Execute based on routing decision
-            if "ROUTE_TO_BOTH" in routing_decision:
-                # Parallel execution
-                if not inventory_card or not customer_service_card:
-                    yield {
-                        "type": "error",
-                        "message": "One or more agents are offline. Cannot execute parallel request.",
-                    }
-                    return
-
-                yield {
-                    "type": "routing",
-                    "agent": "both",
-                    "message": "Coordinating with both inventory and customer service...",
-                }
-
-                # Execute parallel calls
-                responses = await self.call_agents_parallel(query, query, context_id)
+            inventory_card, customer_service_card = await cards
+            # The handler is about to report an agent offline, so the answer would never be shown
+            if speculative is not None and (not inventory_card or (route == "BOTH" and not customer_service_card)):
+                speculative.cancel()
+                speculative = None
 
-                yield {"type": "agent_response", "agent": "parallel"}
+            # Execute based on routing decision
+            async for event in handler(self, query, context_id, inventory_card, customer_service_card, speculative):
+                yield event
 
-                # Combine responses
-                combined_response = f"""I've consulted both our inventory and customer service systems:
+        except Exception as exc:
+            logger.error("Error in host agent stream: %s", exc, exc_info=VERBOSE_ERRORS)
+            yield StreamEvent("error", message=f"Error coordinating request: {str(exc)}")
+        finally:
+            # Safety net for a stream closed or failed before the speculative call was used or dropped
+            if speculative is not None:
+                speculative.cancel()
+
+    async def _stream_both(
+        self,
+        query: str,
+        context_id: str,
+        inventory_card: AgentCard | None,
+        customer_service_card: AgentCard | None,
+        speculative: asyncio.Task[str] | None,
+    ) -> AsyncIterable[StreamEvent]:
+        # Parallel execution
+        if not inventory_card or not customer_service_card:
+            yield StreamEvent("error", message="One or more agents are offline. Cannot execute parallel request.")
+            return
+
+        yield StreamEvent("routing", agent="both", message="Coordinating with both inventory and customer service...")
+
+        # Execute parallel calls, passing each answer on as soon as it arrives
+        responses: dict[str, str] = {}
+        async for agent, response in self._call_agents_as_completed(query, query, context_id, speculative):
+            responses[agent] = response
+            yield StreamEvent("partial_result", agent=agent.replace("_", " "), content=response)
+
+        yield StreamEvent("agent_response", agent="parallel")
+
+        # Combine responses
+        combined_response = f"""I've consulted both our inventory and customer service systems:
 
 **Inventory Information:**
 {responses['inventory']}
@@ -304,44 +639,50 @@ Important guidelines:
 **Customer Service Information:**
 {responses['customer_service']}"""
 
-                yield {"type": "result", "content": combined_response}
-
-            elif "ROUTE_TO_INVENTORY" in routing_decision:
-                # Single inventory agent
-                if not inventory_card:
-                    yield {"type": "error", "message": "Inventory agent is currently offline. Please try again later."}
-                    return
-
-                yield {"type": "routing", "agent": "inventory", "message": "Checking our inventory system..."}
-                response = await self.call_inventory_agent(query, context_id)
-                yield {"type": "agent_response", "agent": "inventory"}
-                yield {"type": "result", "content": response}
-
-            elif "ROUTE_TO_CUSTOMER_SERVICE" in routing_decision:
-                # Single customer service agent
-                if not customer_service_card:
-                    yield {
-                        "type": "error",
-                        "message": "Customer service agent is currently offline. Please try again later.",
-                    }
-                    return
-
-                yield {
-                    "type": "routing",
-                    "agent": "customer service",
-                    "message": "Connecting you with customer service...",
-                }
-                response = await self.call_customer_service_agent(query, context_id)
-                yield {"type": "agent_response", "agent": "customer service"}
-                yield {"type": "result", "content": response}
-
-            else:
-                # Could not determine routing
-                yield {
-                    "type": "error",
-                    "message": "I couldn't determine which agent should handle your request. Please try rephrasing your question.",
-                }
-
-        except Exception as exc:
-            logger.error(f"Error in host agent stream: {exc}", exc_info=True)
-            yield {"type": "error", "message": f"Error coordinating request: {str(exc)}"}
+        yield StreamEvent("result", content=combined_response)
+
+    async def _stream_inventory(
+        self,
+        query: str,
+        context_id: str,
+        inventory_card: AgentCard | None,
+        customer_service_card: AgentCard | None,
+        speculative: asyncio.Task[str] | None,
+    ) -> AsyncIterable[StreamEvent]:
+        # Single inventory agent
+        if not inventory_card:
+            yield StreamEvent("error", message="Inventory agent is currently offline. Please try again later.")
+            return
+
+        yield StreamEvent("routing", agent="inventory", message="Checking our inventory system...")
+        if speculative is not None:
+            response = await speculative
+        else:
+            response = await self.call_inventory_agent(query, context_id)
+        yield StreamEvent("agent_response", agent="inventory")
+        yield StreamEvent("result", content=response)
+
+    async def _stream_customer_service(
+        self,
+        query: str,
+        context_id: str,
+        inventory_card: AgentCard | None,
+        customer_service_card: AgentCard | None,
+        speculative: asyncio.Task[str] | None,
+    ) -> AsyncIterable[StreamEvent]:
+        # Single customer service agent
+        if not customer_service_card:
+            yield StreamEvent("error", message="Customer service agent is currently offline. Please try again later.")
+            return
+
+        yield StreamEvent("routing", agent="customer service", message="Connecting you with customer service...")
+        response = await self.call_customer_service_agent(query, context_id)
+        yield StreamEvent("agent_response", agent="customer service")
+        yield StreamEvent("result", content=response)
+
+    # Routing label (from _ROUTE_RE) -> handler that streams the answer for that route
+    _ROUTE_HANDLERS = {
+        "BOTH": _stream_both,
+        "INVENTORY": _stream_inventory,
+        "CUSTOMER_SERVICE": _stream_customer_service,
+    }
@@ -1,3 +1,4 @@
+import functools
 import logging
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
@@ -5,28 +6,31 @@ from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import (
     InvalidParamsError,
-    Part,
     Task,
-    TaskState,
-    TextPart,
     UnsupportedOperationError,
 )
-from a2a.utils import (
-    new_agent_text_message,
-    new_task,
-)
+from a2a.utils import new_task
 from a2a.utils.errors import ServerError
 
+from backend.utils.a2a_messages import agent_text_message, result_text, text_part
+from backend.utils.error_logging import VERBOSE_ERRORS
+from backend.utils.singleton import LazySingleton
+from backend.utils.status_coalescer import StatusCoalescer
+
 from .agent import HostAgent
 
 logger = logging.getLogger(__name__)
 
 
+# The process-wide agent, created on first use
+_get_agent = LazySingleton(HostAgent).get
+
+
 class HostAgentExecutor(AgentExecutor):
     """Host Agent Executor for A2A Protocol."""
 
     def __init__(self):
-        self.agent = HostAgent()
+        self.agent = _get_agent()
 
     async def execute(
         self,
@@ -35,10 +39,10 @@ class HostAgentExecutor(AgentExecutor):
     ) -> None:
         """Execute host agent request."""
         # Validate request
-        if not context.message or not context.get_user_input():
+        query = context.get_user_input()
+        if not context.message or not query:
             raise ServerError(error=InvalidParamsError())
 
-        query = context.get_user_input()
         task = context.current_task
 
         # Create new task if none exists
@@ -47,6 +51,8 @@ class HostAgentExecutor(AgentExecutor):
             event_queue.enqueue_event(task)
 
         updater = TaskUpdater(event_queue, task.id, task.contextId)
+        make_msg = functools.partial(agent_text_message, context_id=task.contextId, task_id=task.id)
+        status = StatusCoalescer(updater, make_msg)
 
         try:
             # Start working
@@ -54,49 +60,31 @@ class HostAgentExecutor(AgentExecutor):
 
             # Execute agent logic
             async for event in self.agent.stream(query, task.contextId):
-                event_type = event.get("type")
+                event_type = event.type
 
                 if event_type == "status":
                     # Update status
-                    updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            event["message"],
-                            task.contextId,
-                            task.id,
-                        ),
-                    )
+                    status.push(event.message)
 
                 elif event_type == "routing":
                     # Routing to another agent
-                    updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            f"Routing to {event['agent']} agent: {event['message']}",
-                            task.contextId,
-                            task.id,
-                        ),
-                    )
+                    status.push(f"Routing to {event.agent} agent: {event.message}")
 
                 elif event_type == "agent_response":
                     # Response from sub-agent
-                    updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            f"Received response from {event['agent']} agent",
-                            task.contextId,
-                            task.id,
-                        ),
-                    )
+                    status.push(f"Received response from {event.agent} agent")
+
+                elif event_type == "partial_result":
+                    # One of several sub-agents answered; show it before the rest finish.
+                    # It carries an answer, so it is sent as is rather than coalesced away.
+                    status.send(f"Response from {event.agent} agent:\n{event.content}")
 
                 elif event_type == "result":
                     # Final result
-                    content = event["content"]
-                    parts = [Part(root=TextPart(text=str(content)))]
-
+                    status.discard()
                     # Add artifact
                     updater.add_artifact(
-                        parts,
+                        [text_part(result_text(event.content))],
                         name="host_response",
                     )
 
@@ -106,24 +94,17 @@ class HostAgentExecutor(AgentExecutor):
 
                 elif event_type == "error":
                     # Error occurred
-                    updater.failed(
-                        new_agent_text_message(
-                            f"Error: {event['message']}",
-                            task.contextId,
-                            task.id,
-                        )
-                    )
+                    status.discard()
+                    updater.failed(make_msg(f"Error: {event.message}"))
                     break
 
         except Exception as e:
-            logger.error(f"Error executing host agent: {e}", exc_info=True)
-            updater.failed(
-                new_agent_text_message(
-                    f"Internal error: {str(e)}",
-                    task.contextId,
-                    task.id,
-                )
-            )
+            status.discard()
+            logger.error("Error executing host agent: %s", e, exc_info=VERBOSE_ERRORS)
+            updater.failed(make_msg(f"Internal error: {str(e)}"))
+        finally:
+            # Don't leave a timer running past the end of the request
+            status.flush()
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> Task | None:
         """Cancel a task - not supported for this agent."""
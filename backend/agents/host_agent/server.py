@@ -1,22 +1,26 @@
+import contextlib
 import logging
 import os
 import click
 from dotenv import load_dotenv
 
+# Load .env before the agent modules are imported: they read their tuning knobs at import time
+load_dotenv()
+
 # Import the correct A2A components
-from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
 )
 
+from backend.utils.a2a_server import FastA2AStarletteApplication
+from backend.utils.task_store import DEFAULT_TASK_STORE_SIZE, LruTaskStore
+
 from .agent import HostAgent
 from .agent_executor import HostAgentExecutor
 
-load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -24,7 +28,13 @@ logger = logging.getLogger(__name__)
 @click.command()
 @click.option("--host", default="0.0.0.0", help="Host to run the server on")
 @click.option("--port", default=8000, help="Port to run the server on")
-def main(host: str, port: int):
+@click.option(
+    "--task-store-size",
+    default=DEFAULT_TASK_STORE_SIZE,
+    type=click.IntRange(min=1),
+    help="Maximum number of tasks kept in memory",
+)
+def main(host: str, port: int, task_store_size: int):
     """Start the Host Agent A2A server."""
     try:
         # Check for API key
@@ -62,13 +72,14 @@ def main(host: str, port: int):
         )
 
         # Create request handler
+        agent_executor = HostAgentExecutor()
         request_handler = DefaultRequestHandler(
-            agent_executor=HostAgentExecutor(),
-            task_store=InMemoryTaskStore(),
+            agent_executor=agent_executor,
+            task_store=LruTaskStore(task_store_size),
         )
 
-        # Create A2A server
-        server = A2AStarletteApplication(
+        # Create A2A server; the agent card is serialized once and served as bytes
+        server = FastA2AStarletteApplication(
             agent_card=agent_card,
             http_handler=request_handler,
         )
@@ -76,8 +87,30 @@ def main(host: str, port: int):
         # Start server
         import uvicorn
 
+        # Prefer the libuv loop and C HTTP parser; fall back to stdlib asyncio (e.g. on Windows)
+        try:
+            import uvloop  # noqa: F401
+
+            loop_kind = "uvloop"
+        except ImportError:
+            loop_kind = "asyncio"
+        try:
+            import httptools  # noqa: F401
+
+            http_kind = "httptools"
+        except ImportError:
+            http_kind = "h11"
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            # Pre-fetch agent cards and open connections before the first query arrives
+            await agent_executor.agent.warmup()
+            yield
+            # Release pooled keep-alive connections to the remote agents
+            await agent_executor.agent.aclose()
+
         logger.info(f"Starting Host Agent on http://{host}:{port}")
-        uvicorn.run(server.build(), host=host, port=port)
+        uvicorn.run(server.build(lifespan=lifespan), host=host, port=port, loop=loop_kind, http=http_kind)
 
     except Exception as e:
         logger.error(f"Server startup error: {e}")
@@ -1,7 +1,9 @@
+import asyncio
+import functools
 import logging
 import os
 from typing import Any
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Awaitable, Callable
 
 from google.adk.agents import Agent
 from google.adk.artifacts import InMemoryArtifactService
@@ -17,16 +19,57 @@ from pathlib import Path
 # Add the project root to the path to import from backend.utils
 ROOT = Path(__file__).resolve().parent.parent.parent.parent
 sys.path.insert(0, str(ROOT))
+from backend.utils.error_logging import VERBOSE_ERRORS
+from backend.utils.session_cache import SessionCache
+from backend.utils.stream_events import StreamEvent
 from backend.utils.vector_search_store import VertexSearchStore
 
 logger = logging.getLogger(__name__)
 
 
+def _product_source(result: dict[str, Any]) -> dict[str, Any]:
+    """Return where a search hit keeps its product fields: nested ``metadata`` or the hit itself."""
+    return result["metadata"] if "metadata" in result else result
+
+
+def _product_summary(result: dict[str, Any], source: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": result.get("id"),
+        "name": source.get("name"),
+        "description": source.get("description"),
+        "category": source.get("category"),
+        "price": source.get("price"),
+        "stock_quantity": source.get("stock_quantity", 0),
+        "stock_status": source.get("stock_status"),
+        "sku": source.get("sku"),
+        "brand": source.get("brand"),
+    }
+
+
+def _off_loop(tool: Callable[..., dict[str, Any]]) -> Callable[..., Awaitable[dict[str, Any]]]:
+    """Expose a blocking tool to ADK as a coroutine that runs in a worker thread.
+
+    The tools make synchronous Vertex AI Search calls, and ADK calls sync tools directly on
+    the event loop, where one slow search would stall every other request the server is
+    handling. ``functools.wraps`` keeps the name, docstring and signature ADK builds the
+    function declaration from.
+    """
+
+    @functools.wraps(tool)
+    async def run(*args: Any, **kwargs: Any) -> dict[str, Any]:
+        return await asyncio.to_thread(tool, *args, **kwargs)
+
+    return run
+
+
 class InventoryAgent:
     """Inventory management agent that handles product availability and stock levels using Vertex AI Search."""
 
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
 
+    # Sessions kept in the local fast-path cache in front of the session service
+    SESSION_CACHE_SIZE = 1024
+
     def __init__(self):
         # Initialize Vertex AI Search Store
         serving_config = os.getenv("VERTEX_SEARCH_SERVING_CONFIG")
@@ -46,6 +89,9 @@ class InventoryAgent:
             session_service=InMemorySessionService(),
             memory_service=InMemoryMemoryService(),
         )
+        self._sessions = SessionCache(
+            self._runner.session_service, self._agent.name, self._user_id, self.SESSION_CACHE_SIZE
+        )
 
     def _build_agent(self) -> Agent:
         """Build the ADK agent for inventory management."""
@@ -53,41 +99,32 @@ class InventoryAgent:
         search_store = self._search_store
 
         def check_product_availability(product_id: str) -> dict[str, Any]:
-            """Check if a specific product is available in inventory."""
+            """Check if a specific product is available in inventory.
+
+            Args:
+                product_id: Product ID, or the product's SKU
+            """
             try:
-                # Use exact ID matching
-                result = search_store.get_by_id(product_id)
+                # Exact ID match first, then a case-insensitive SKU match
+                result = search_store.get_by_id(product_id) or search_store.get_by_sku(product_id)
 
                 if result:
-                    if "metadata" in result:
-                        metadata = result["metadata"]
-                        return {
-                            "status": "success",
-                            "product_id": result.get("id", product_id),
-                            "name": metadata.get("name", "Unknown"),
-                            "available": metadata.get("stock_quantity", 0) > 0,
-                            "stock_quantity": metadata.get("stock_quantity", 0),
-                            "stock_status": metadata.get("stock_status", "Unknown"),
-                            "price": metadata.get("price", 0),
-                            "description": metadata.get("description", ""),
-                            "category": metadata.get("category", ""),
-                            "brand": metadata.get("brand", ""),
-                            "sku": metadata.get("sku", ""),
-                        }
-                    else:
-                        return {
-                            "status": "success",
-                            "product_id": result.get("id", product_id),
-                            "name": result.get("name", "Unknown"),
-                            "available": result.get("stock_quantity", 0) > 0,
-                            "stock_quantity": result.get("stock_quantity", 0),
-                            "stock_status": result.get("stock_status", "Unknown"),
-                            "price": result.get("price", 0),
-                            "description": result.get("description", ""),
-                            "category": result.get("category", ""),
-                            "brand": result.get("brand", ""),
-                            "sku": result.get("sku", ""),
-                        }
+                    source = _product_source(result)
+                    # A missing or null quantity means nothing is known to be in stock
+                    stock_quantity = source.get("stock_quantity") or 0
+                    return {
+                        "status": "success",
+                        "product_id": result.get("id", product_id),
+                        "name": source.get("name", "Unknown"),
+                        "available": stock_quantity > 0,
+                        "stock_quantity": stock_quantity,
+                        "stock_status": source.get("stock_status", "Unknown"),
+                        "price": source.get("price", 0),
+                        "description": source.get("description", ""),
+                        "category": source.get("category", ""),
+                        "brand": source.get("brand", ""),
+                        "sku": source.get("sku", ""),
+                    }
 
                 return {
                     "status": "error",
@@ -95,7 +132,7 @@ class InventoryAgent:
                 }
 
             except Exception as e:
-                logger.error(f"Error checking product availability: {e}")
+                logger.error("Error checking product availability: %s", e)
                 return {
                     "status": "error",
                     "error_message": f"Failed to check product: {str(e)}",
@@ -111,41 +148,13 @@ class InventoryAgent:
                 # Use Vertex AI Search's hybrid search capabilities
                 results = search_store.search(query=query, top_k=20)
 
-                products = []
-                for result in results:
-                    # Handle both metadata and flattened data structures
-                    if "metadata" in result:
-                        metadata = result["metadata"]
-                        products.append(
-                            {
-                                "id": result.get("id"),
-                                "name": metadata.get("name"),
-                                "description": metadata.get("description"),
-                                "category": metadata.get("category"),
-                                "price": metadata.get("price"),
-                                "stock_quantity": metadata.get("stock_quantity", 0),
-                                "stock_status": metadata.get("stock_status"),
-                                "sku": metadata.get("sku"),
-                                "brand": metadata.get("brand"),
-                                "similarity_score": result.get("similarity_score", 0),
-                            }
-                        )
-                    else:
-                        # Flattened structure
-                        products.append(
-                            {
-                                "id": result.get("id"),
-                                "name": result.get("name"),
-                                "description": result.get("description"),
-                                "category": result.get("category"),
-                                "price": result.get("price"),
-                                "stock_quantity": result.get("stock_quantity", 0),
-                                "stock_status": result.get("stock_status"),
-                                "sku": result.get("sku"),
-                                "brand": result.get("brand"),
-                                "similarity_score": result.get("similarity_score", 0),
-                            }
-                        )
+                products = [
+                    {
+                        **_product_summary(result, _product_source(result)),
+                        "similarity_score": result.get("similarity_score", 0),
+                    }
+                    for result in results
+                ]
 
                 return {
                     "status": "success",
@@ -154,7 +163,7 @@ class InventoryAgent:
                 }
 
             except Exception as e:
-                logger.error(f"Error searching products: {e}")
+                logger.error("Error searching products: %s", e)
                 return {
                     "status": "error",
                     "error_message": f"Search failed: {str(e)}",
@@ -169,45 +178,16 @@ class InventoryAgent:
             """
             try:
                 # Search with category filter
-                query = f"category:{category.lower()}"
+                category_lower = category.lower()
+                query = f"category:{category_lower}"
                 results = search_store.search(query=query, top_k=50)
 
+                # Double-check category match
                 products = []
                 for result in results:
-                    # Get product data
-                    if "metadata" in result:
-                        metadata = result["metadata"]
-                        # Double-check category match
-                        if metadata.get("category", "").lower() == category.lower():
-                            products.append(
-                                {
-                                    "id": result.get("id"),
-                                    "name": metadata.get("name"),
-                                    "description": metadata.get("description"),
-                                    "category": metadata.get("category"),
-                                    "price": metadata.get("price"),
-                                    "stock_quantity": metadata.get("stock_quantity", 0),
-                                    "stock_status": metadata.get("stock_status"),
-                                    "sku": metadata.get("sku"),
-                                    "brand": metadata.get("brand"),
-                                }
-                            )
-                    else:
-                        # Flattened structure
-                        if result.get("category", "").lower() == category.lower():
-                            products.append(
-                                {
-                                    "id": result.get("id"),
-                                    "name": result.get("name"),
-                                    "description": result.get("description"),
-                                    "category": result.get("category"),
-                                    "price": result.get("price"),
-                                    "stock_quantity": result.get("stock_quantity", 0),
-                                    "stock_status": result.get("stock_status"),
-                                    "sku": result.get("sku"),
-                                    "brand": result.get("brand"),
-                                }
-                            )
+                    source = _product_source(result)
+                    if source.get("category", "").lower() == category_lower:
+                        products.append(_product_summary(result, source))
 
                 return {
                     "status": "success",
@@ -216,7 +196,7 @@ class InventoryAgent:
                 }
 
             except Exception as e:
-                logger.error(f"Error searching by category: {e}")
+                logger.error("Error searching by category: %s", e)
                 return {
                     "status": "error",
                     "error_message": f"Category search failed: {str(e)}",
@@ -239,40 +219,11 @@ class InventoryAgent:
 
                 products = []
                 for result in results:
-                    # Get price from appropriate location
-                    if "metadata" in result:
-                        price = result["metadata"].get("price", 0)
-                        if min_price <= price <= max_price:
-                            metadata = result["metadata"]
-                            products.append(
-                                {
-                                    "id": result.get("id"),
-                                    "name": metadata.get("name"),
-                                    "description": metadata.get("description"),
-                                    "category": metadata.get("category"),
-                                    "price": price,
-                                    "stock_quantity": metadata.get("stock_quantity", 0),
-                                    "stock_status": metadata.get("stock_status"),
-                                    "sku": metadata.get("sku"),
-                                    "brand": metadata.get("brand"),
-                                }
-                            )
-                    else:
-                        price = result.get("price", 0)
-                        if min_price <= price <= max_price:
-                            products.append(
-                                {
-                                    "id": result.get("id"),
-                                    "name": result.get("name"),
-                                    "description": result.get("description"),
-                                    "category": result.get("category"),
-                                    "price": price,
-                                    "stock_quantity": result.get("stock_quantity", 0),
-                                    "stock_status": result.get("stock_status"),
-                                    "sku": result.get("sku"),
-                                    "brand": result.get("brand"),
-                                }
-                            )
+                    source = _product_source(result)
+                    # A missing or null price counts as 0, so such products only match ranges from 0
+                    price = source.get("price") or 0
+                    if min_price <= price <= max_price:
+                        products.append({**_product_summary(result, source), "price": price})
 
                 # Sort by price
                 products.sort(key=lambda x: x["price"])
@@ -284,7 +235,7 @@ class InventoryAgent:
                 }
 
             except Exception as e:
-                logger.error(f"Error searching by price range: {e}")
+                logger.error("Error searching by price range: %s", e)
                 return {
                     "status": "error",
                     "error_message": f"Price range search failed: {str(e)}",
@@ -294,45 +245,26 @@ class InventoryAgent:
         def get_low_stock_items(threshold: int) -> dict[str, Any]:
             """Get items that are low in stock.
 
+            Stock levels come from a catalog snapshot refreshed every 30 seconds that covers
+            at most the first 200 products.
+
             Args:
                 threshold: Stock quantity threshold (items below this are considered low stock)
             """
             try:
-                # Search for products with stock information
-                query = "stock_quantity stock inventory"
-                results = search_store.search(query=query, top_k=100)
-
+                # The store keeps in-stock products sorted by quantity, lowest first
                 low_stock_items = []
-                for result in results:
-                    # Get stock quantity from appropriate location
-                    if "metadata" in result:
-                        stock_quantity = result["metadata"].get("stock_quantity", 0)
-                        if 0 < stock_quantity < threshold:
-                            metadata = result["metadata"]
-                            low_stock_items.append(
-                                {
-                                    "id": result.get("id"),
-                                    "name": metadata.get("name"),
-                                    "current_stock": stock_quantity,
-                                    "category": metadata.get("category"),
-                                    "sku": metadata.get("sku"),
-                                }
-                            )
-                    else:
-                        stock_quantity = result.get("stock_quantity", 0)
-                        if 0 < stock_quantity < threshold:
-                            low_stock_items.append(
-                                {
-                                    "id": result.get("id"),
-                                    "name": result.get("name"),
-                                    "current_stock": stock_quantity,
-                                    "category": result.get("category"),
-                                    "sku": result.get("sku"),
-                                }
-                            )
-
-                # Sort by stock quantity (lowest first)
-                low_stock_items.sort(key=lambda x: x["current_stock"])
+                for result in search_store.get_low_stock(threshold):
+                    source = _product_source(result)
+                    low_stock_items.append(
+                        {
+                            "id": result.get("id"),
+                            "name": source.get("name"),
+                            "current_stock": source.get("stock_quantity"),
+                            "category": source.get("category"),
+                            "sku": source.get("sku"),
+                        }
+                    )
 
                 return {
                     "status": "success",
@@ -342,7 +274,7 @@ class InventoryAgent:
                 }
 
             except Exception as e:
-                logger.error(f"Error getting low stock items: {e}")
+                logger.error("Error getting low stock items: %s", e)
                 return {
                     "status": "error",
                     "error_message": f"Low stock search failed: {str(e)}",
@@ -356,37 +288,7 @@ class InventoryAgent:
                 query = "*"  # Or use a generic term like "product"
                 results = search_store.search(query=query, top_k=100)
 
-                products = []
-                for result in results:
-                    if "metadata" in result:
-                        metadata = result["metadata"]
-                        products.append(
-                            {
-                                "id": result.get("id"),
-                                "name": metadata.get("name"),
-                                "description": metadata.get("description"),
-                                "category": metadata.get("category"),
-                                "price": metadata.get("price"),
-                                "stock_quantity": metadata.get("stock_quantity", 0),
-                                "stock_status": metadata.get("stock_status"),
-                                "sku": metadata.get("sku"),
-                                "brand": metadata.get("brand"),
-                            }
-                        )
-                    else:
-                        products.append(
-                            {
-                                "id": result.get("id"),
-                                "name": result.get("name"),
-                                "description": result.get("description"),
-                                "category": result.get("category"),
-                                "price": result.get("price"),
-                                "stock_quantity": result.get("stock_quantity", 0),
-                                "stock_status": result.get("stock_status"),
-                                "sku": result.get("sku"),
-                                "brand": result.get("brand"),
-                            }
-                        )
+                products = [_product_summary(result, _product_source(result)) for result in results]
 
                 return {
                     "status": "success",
@@ -395,7 +297,7 @@ class InventoryAgent:
                 }
 
             except Exception as e:
-                logger.error(f"Error getting all products: {e}")
+                logger.error("Error getting all products: %s", e)
                 return {
                     "status": "error",
                     "error_message": f"Failed to retrieve products: {str(e)}",
@@ -453,85 +355,71 @@ When responding with product information, format it clearly with details like:
 
 If a search returns no results, try different search approaches before saying the item is not available.""",
             tools=[
-                check_product_availability,
-                search_products_by_query,
-                search_products_by_category,
-                search_products_by_price_range,
-                get_low_stock_items,
-                get_all_products,
+                _off_loop(tool)
+                for tool in (
+                    check_product_availability,
+                    search_products_by_query,
+                    search_products_by_category,
+                    search_products_by_price_range,
+                    get_low_stock_items,
+                    get_all_products,
+                )
             ],
         )
 
-    async def stream(self, query: str, session_id: str) -> AsyncIterable[dict[str, Any]]:
+    async def stream(self, query: str, session_id: str) -> AsyncIterable[StreamEvent]:
         """Stream responses from the inventory agent."""
         try:
-            # Get or create session
-            session = await self._runner.session_service.get_session(
-                app_name=self._agent.name,
-                user_id=self._user_id,
-                session_id=session_id,
-            )
+            session = await self._sessions.get_or_create(session_id)
 
-            if session is None:
-                session = await self._runner.session_service.create_session(
-                    app_name=self._agent.name,
-                    user_id=self._user_id,
-                    state={},
-                    session_id=session_id,
-                )
-
-            # Create user message
-            content = types.Content(role="user", parts=[types.Part.from_text(text=query)])
+            # Create user message; Part.from_text does no normalization, so skip validation
+            content = types.Content.model_construct(role="user", parts=[types.Part.model_construct(text=query)])
 
             # Yield initial status
-            yield {"type": "status", "message": "Searching inventory database..."}
+            yield StreamEvent("status", message="Searching inventory database...")
 
             # Run agent
             final_response = None
+            text_parts: list[str] = []
+            response_data = None
 
             async for event in self._runner.run_async(
                 user_id=self._user_id, session_id=session.id, new_message=content
             ):
-                # Check for tool calls
+                is_final = event.is_final_response()
+                if is_final:
+                    final_response = event
+                    text_parts = []
+                    response_data = None
+
+                # Single pass over the parts: report tool calls and collect the final event's output
                 if event.content and event.content.parts:
                     for part in event.content.parts:
                         if part.function_call:
-                            yield {
-                                "type": "tool_call",
-                                "tool_name": part.function_call.name,
-                                "message": f"Searching Vertex AI: {part.function_call.name.replace('_', ' ')}...",
-                            }
-
-                # Check for final response
-                if event.is_final_response():
-                    final_response = event
+                            yield StreamEvent(
+                                "tool_call",
+                                tool_name=part.function_call.name,
+                                message=f"Searching Vertex AI: {part.function_call.name.replace('_', ' ')}...",
+                            )
+                        if is_final:
+                            if part.text:
+                                text_parts.append(part.text)
+                            elif part.function_response:
+                                response_data = part.function_response.response
+                        elif part.text:
+                            # Interim model text (e.g. before a tool call): pass it on right away
+                            yield StreamEvent("partial", content=part.text)
 
             # Process final response
             if final_response and final_response.content:
-                response_text = ""
-                response_data = None
-
-                if final_response.content.parts:
-                    # Extract text parts
-                    text_parts = []
-                    for part in final_response.content.parts:
-                        if part.text:
-                            text_parts.append(part.text)
-                        elif part.function_response:
-                            # Handle function response
-                            response_data = part.function_response.response
-
-                    if text_parts:
-                        response_text = "\n".join(text_parts)
-
                 # Yield final result
                 if response_data:
-                    yield {"type": "result", "content": response_data}
+                    yield StreamEvent("result", content=response_data)
                 else:
-                    yield {"type": "result", "content": response_text or "No response generated"}
+                    yield StreamEvent("result", content="\n".join(text_parts) or "No response generated")
             else:
-                yield {"type": "error", "message": "No response from inventory agent"}
+                yield StreamEvent("error", message="No response from inventory agent")
 
         except Exception as e:
-            logger.error(f"Error in inventory agent stream: {e}", exc_info=True)
-            yield {"type": "error", "message": f"Error processing inventory request: {str(e)}"}
+            logger.error("Error in inventory agent stream: %s", e, exc_info=VERBOSE_ERRORS)
+            yield StreamEvent("error", message=f"Error processing inventory request: {str(e)}")
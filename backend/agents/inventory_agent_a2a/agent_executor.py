@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Callable
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
@@ -7,27 +8,82 @@ from a2a.types import (
     InvalidParamsError,
     Part,
     Task,
-    TaskState,
     TextPart,
     DataPart,
     UnsupportedOperationError,
 )
-from a2a.utils import (
-    new_agent_text_message,
-    new_task,
-)
+from a2a.utils import new_task
 from a2a.utils.errors import ServerError
 
+from backend.utils.a2a_messages import agent_text_message
+from backend.utils.error_logging import VERBOSE_ERRORS
+from backend.utils.singleton import LazySingleton
+from backend.utils.status_coalescer import StatusSender
+from backend.utils.stream_events import StreamEvent
+
 from .agent import InventoryAgent
 
 logger = logging.getLogger(__name__)
 
 
+# The process-wide agent, created on first use
+_get_agent = LazySingleton(InventoryAgent).get
+
+
+def _on_status(updater: TaskUpdater, status: StatusSender, event: StreamEvent) -> bool:
+    status.send(agent_text_message(event.message, status.context_id, status.task_id))
+    return False
+
+
+def _on_tool_call(updater: TaskUpdater, status: StatusSender, event: StreamEvent) -> bool:
+    text = f"Calling {event.tool_name}: {event.message or 'Processing...'}"
+    status.send(agent_text_message(text, status.context_id, status.task_id))
+    return False
+
+
+def _on_partial(updater: TaskUpdater, status: StatusSender, event: StreamEvent) -> bool:
+    status.send(agent_text_message(event.content, status.context_id, status.task_id))
+    return False
+
+
+def _on_result(updater: TaskUpdater, status: StatusSender, event: StreamEvent) -> bool:
+    content = event.content
+
+    # Check if it's JSON data or plain text
+    if isinstance(content, dict):
+        parts = [Part(root=DataPart(data=content))]
+    else:
+        parts = [Part(root=TextPart(text=str(content)))]
+
+    updater.add_artifact(
+        parts,
+        name="inventory_result",
+    )
+    updater.complete()
+    return True
+
+
+def _on_error(updater: TaskUpdater, status: StatusSender, event: StreamEvent) -> bool:
+    updater.failed(agent_text_message(f"Error: {event.message}", status.context_id, status.task_id))
+    return True
+
+
+# Stream event type -> handler; a handler returns True when the event ends the task.
+# Working-state updates go through the StatusSender, terminal ones through the TaskUpdater.
+EVENT_HANDLERS: dict[str, Callable[[TaskUpdater, StatusSender, StreamEvent], bool]] = {
+    "status": _on_status,
+    "tool_call": _on_tool_call,
+    "partial": _on_partial,
+    "result": _on_result,
+    "error": _on_error,
+}
+
+
 class InventoryAgentExecutor(AgentExecutor):
     """Inventory Agent Executor for A2A Protocol."""
 
     def __init__(self):
-        self.agent = InventoryAgent()
+        self.agent = _get_agent()
 
     async def execute(
         self,
@@ -36,10 +92,10 @@ class InventoryAgentExecutor(AgentExecutor):
     ) -> None:
         """Execute inventory agent request."""
         # Validate request
-        if not context.message or not context.get_user_input():
+        query = context.get_user_input()
+        if not context.message or not query:
             raise ServerError(error=InvalidParamsError())
 
-        query = context.get_user_input()
         task = context.current_task
 
         # Create new task if none exists
@@ -48,6 +104,7 @@ class InventoryAgentExecutor(AgentExecutor):
             event_queue.enqueue_event(task)
 
         updater = TaskUpdater(event_queue, task.id, task.contextId)
+        status = StatusSender.for_updater(updater)
 
         try:
             # Start working
@@ -55,70 +112,13 @@ class InventoryAgentExecutor(AgentExecutor):
 
             # Execute agent logic
             async for event in self.agent.stream(query, task.contextId):
-                event_type = event.get("type")
-
-                if event_type == "status":
-                    # Update status
-                    updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            event["message"],
-                            task.contextId,
-                            task.id,
-                        ),
-                    )
-
-                elif event_type == "tool_call":
-                    # Tool is being called
-                    updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            f"Calling {event['tool_name']}: {event.get('message', 'Processing...')}",
-                            task.contextId,
-                            task.id,
-                        ),
-                    )
-
-                elif event_type == "result":
-                    # Final result
-                    content = event["content"]
-
-                    # Check if it's JSON data or plain text
-                    if isinstance(content, dict):
-                        parts = [Part(root=DataPart(data=content))]
-                    else:
-                        parts = [Part(root=TextPart(text=str(content)))]
-
-                    # Add artifact
-                    updater.add_artifact(
-                        parts,
-                        name="inventory_result",
-                    )
-
-                    # Complete task
-                    updater.complete()
-                    break
-
-                elif event_type == "error":
-                    # Error occurred
-                    updater.failed(
-                        new_agent_text_message(
-                            f"Error: {event['message']}",
-                            task.contextId,
-                            task.id,
-                        )
-                    )
+                handler = EVENT_HANDLERS.get(event.type)
+                if handler and handler(updater, status, event):
                     break
 
         except Exception as e:
-            logger.error(f"Error executing inventory agent: {e}", exc_info=True)
-            updater.failed(
-                new_agent_text_message(
-                    f"Internal error: {str(e)}",
-                    task.contextId,
-                    task.id,
-                )
-            )
+            logger.error("Error executing inventory agent: %s", e, exc_info=VERBOSE_ERRORS)
+            updater.failed(agent_text_message(f"Internal error: {str(e)}", task.contextId, task.id))
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> Task | None:
         """Cancel a task - not supported for this agent."""
@@ -3,19 +3,22 @@ import os
 import click
 from dotenv import load_dotenv
 
-from a2a.server.apps import A2AStarletteApplication
+# Load .env before the agent modules are imported: they read their tuning knobs at import time
+load_dotenv()
+
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
 )
 
+from backend.utils.a2a_server import FastA2AStarletteApplication
+from backend.utils.task_store import DEFAULT_TASK_STORE_SIZE, LruTaskStore
+
 from .agent import InventoryAgent
 from .agent_executor import InventoryAgentExecutor
 
-load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -29,7 +32,13 @@ class MissingConfigError(Exception):
 @click.command()
 @click.option("--host", default="0.0.0.0", help="Host to run the server on")
 @click.option("--port", default=8001, help="Port to run the server on")
-def main(host: str, port: int):
+@click.option(
+    "--task-store-size",
+    default=DEFAULT_TASK_STORE_SIZE,
+    type=click.IntRange(min=1),
+    help="Maximum number of tasks kept in memory",
+)
+def main(host: str, port: int, task_store_size: int):
     """Start the Inventory Agent A2A server with Vertex AI Search integration."""
     try:
         # Check for required configuration
@@ -85,11 +94,11 @@ def main(host: str, port: int):
         # Create request handler
         request_handler = DefaultRequestHandler(
             agent_executor=InventoryAgentExecutor(),
-            task_store=InMemoryTaskStore(),
+            task_store=LruTaskStore(task_store_size),
         )
 
-        # Create A2A server
-        server = A2AStarletteApplication(
+        # Create A2A server; results (often large DataPart artifacts) are JSON-encoded in one pass
+        server = FastA2AStarletteApplication(
             agent_card=agent_card,
             http_handler=request_handler,
         )
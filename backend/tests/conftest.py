@@ -26,6 +26,16 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_customer_service_graph():
+    """Give each test a freshly compiled customer service graph, since tests patch it in place."""
+    from backend.agents.customer_service_a2a.agent import CustomerServiceAgent
+
+    CustomerServiceAgent._graph = None
+    yield
+    CustomerServiceAgent._graph = None
+
+
 @pytest.fixture
 def mock_vector_store():
     """Mock VertexSearchStore for testing."""
@@ -75,6 +85,19 @@ def mock_vector_store():
 
     store.get_by_id = Mock(side_effect=mock_get_by_id)
 
+    # Mock get_by_sku
+    def mock_get_by_sku(sku: str):
+        return mock_get_by_id("PROD-001") if sku.lower() == "tv-55-4k-001" else None
+
+    store.get_by_sku = Mock(side_effect=mock_get_by_sku)
+
+    # Mock get_low_stock over the same products the search returns
+    def mock_get_low_stock(threshold: float):
+        hits = [p for p in store.search.return_value if 0 < (p.get("stock_quantity") or 0) < threshold]
+        return sorted(hits, key=lambda p: p["stock_quantity"])
+
+    store.get_low_stock = Mock(side_effect=mock_get_low_stock)
+
     return store
 
 
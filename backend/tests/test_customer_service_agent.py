@@ -2,10 +2,22 @@
 Unit tests for the Customer Service Agent.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 
-from backend.agents.customer_service_a2a.agent import CustomerServiceAgent
+from langchain_core.messages import ToolMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from backend.agents.customer_service_a2a.agent import (
+    AgentEvent,
+    BoundedMemorySaver,
+    CustomerServiceAgent,
+    _clean_order_id,
+    check_order_status,
+)
+from backend.utils.status_coalescer import StatusCoalescer
 
 
 class TestCustomerServiceAgent:
@@ -53,11 +65,10 @@ class TestCustomerServiceAgent:
 
         # Mock get_agent_response
         customer_service_agent.get_agent_response = Mock(
-            return_value={
-                "is_task_complete": True,
-                "require_user_input": False,
-                "content": "Our store hours are Monday-Saturday 9 AM - 9 PM, Sunday 10 AM - 6 PM.",
-            }
+            return_value=AgentEvent(
+                "Our store hours are Monday-Saturday 9 AM - 9 PM, Sunday 10 AM - 6 PM.",
+                is_task_complete=True,
+            )
         )
 
         responses = []
@@ -69,7 +80,8 @@ class TestCustomerServiceAgent:
 
         # Check response structure
         last_response = responses[-1]
-        assert "content" in last_response or "is_task_complete" in last_response
+        assert isinstance(last_response, AgentEvent)
+        assert last_response.content
 
     def test_invoke_method(self, customer_service_agent):
         """Test the invoke method."""
@@ -81,19 +93,111 @@ class TestCustomerServiceAgent:
 
         # Mock get_agent_response
         customer_service_agent.get_agent_response = Mock(
-            return_value={
-                "is_task_complete": True,
-                "require_user_input": False,
-                "content": "Our store hours are Monday-Saturday 9 AM - 9 PM.",
-            }
+            return_value=AgentEvent("Our store hours are Monday-Saturday 9 AM - 9 PM.", is_task_complete=True)
         )
 
         result = customer_service_agent.invoke(query, session_id)
 
-        assert isinstance(result, dict)
-        assert "content" in result
+        assert isinstance(result, AgentEvent)
+        assert result.content
         customer_service_agent.graph.invoke.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_abatch_invoke(self, customer_service_agent):
+        """Test that batched invocations run per session and keep input order."""
+
+        async def fake_ainvoke(inputs, config):
+            return {"thread": config["configurable"]["thread_id"]}
+
+        customer_service_agent.graph.ainvoke = fake_ainvoke
+        customer_service_agent.get_agent_response = Mock(
+            side_effect=lambda config, values: AgentEvent(values["thread"])
+        )
+
+        results = await customer_service_agent.abatch_invoke([("Hours?", "s1"), ("Order ORD-12345?", "s2")])
+
+        assert [r.content for r in results] == ["s1", "s2"]
+
+    @pytest.mark.asyncio
+    async def test_abatch_invoke_bounds_graph_runs(self, customer_service_agent):
+        """Test that at most ``max_concurrency`` graph runs are in flight at once."""
+        in_flight = peak = 0
+
+        async def fake_ainvoke(inputs, config):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"thread": config["configurable"]["thread_id"]}
+
+        customer_service_agent.graph.ainvoke = fake_ainvoke
+        customer_service_agent.get_agent_response = Mock(
+            side_effect=lambda config, values: AgentEvent(values["thread"])
+        )
+
+        items = [("Hours?", f"s{i}") for i in range(5)]
+        results = await customer_service_agent.abatch_invoke(items, max_concurrency=2)
+
+        assert [r.content for r in results] == [f"s{i}" for i in range(5)]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_releases_gemini_slot_while_consumer_is_paused(self, customer_service_agent):
+        """Test that a paused stream consumer does not hold a Gemini concurrency slot."""
+
+        async def fake_astream(inputs, config, stream_mode):
+            yield {"tools": {"messages": [ToolMessage(content="ok", tool_call_id="1")]}}
+            yield {"agent": {"structured_response": object()}}
+
+        customer_service_agent.graph.astream = Mock(side_effect=fake_astream)
+        customer_service_agent.get_agent_response = Mock(return_value=AgentEvent("Done", is_task_complete=True))
+
+        semaphore = asyncio.Semaphore(1)
+        with patch("backend.agents.customer_service_a2a.agent._GEMINI_SEM", semaphore):
+            stream = customer_service_agent.stream("Hours?", "s1")
+            await anext(stream)
+            assert await anext(stream) == AgentEvent("Processing information...")
+
+            # Suspended at a yield: another request can take the only slot
+            await asyncio.wait_for(semaphore.acquire(), timeout=1)
+            semaphore.release()
+
+            assert [event async for event in stream][-1] == AgentEvent("Done", is_task_complete=True)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "My product arrived damaged",
+            "The item I received is broken, what can I do?",
+            "I have a complaint about an item",
+            "Is a manager available to talk?",
+            "What's your warranty on products?",
+            "Can I get a price adjustment on a product I bought last week?",
+        ],
+    )
+    async def test_stream_answers_service_queries_that_mention_products(self, customer_service_agent, query):
+        """Test that service queries mentioning products or availability reach the model, not the inventory bounce."""
+
+        async def fake_astream(inputs, config, stream_mode):
+            yield {"agent": {"structured_response": object()}}
+
+        customer_service_agent.graph.astream = Mock(side_effect=fake_astream)
+        customer_service_agent.get_agent_response = Mock(
+            return_value=AgentEvent("Happy to help", is_task_complete=True)
+        )
+
+        responses = [r async for r in customer_service_agent.stream(query, "test-session")]
+
+        customer_service_agent.graph.astream.assert_called_once()
+        assert not any(r.inventory_query for r in responses)
+        assert responses[-1] == AgentEvent("Happy to help", is_task_complete=True)
+
+    def test_graph_is_shared(self, customer_service_agent):
+        """Test that agents reuse one compiled graph."""
+        assert CustomerServiceAgent().graph is customer_service_agent.graph
+
     def test_tools_exist(self, customer_service_agent):
         """Test that the required tools are present."""
         tool_names = [tool.name for tool in customer_service_agent.tools]
@@ -101,3 +205,62 @@ class TestCustomerServiceAgent:
         assert "check_order_status" in tool_names
         assert "get_store_hours" in tool_names
         assert "process_return_request" in tool_names
+
+    def test_clean_order_id(self):
+        """Test order ID canonicalization."""
+        assert _clean_order_id(" ord-12345?! ") == "ORD-12345"
+        assert _clean_order_id("12345.") == "ORD-12345"
+        # The prefix without a dash, or with a space, is still recognised
+        assert _clean_order_id("ORD12345") == "ORD-12345"
+        assert _clean_order_id("ord 12345") == "ORD-12345"
+        # Leading characters that happen to be in "ORD-" must be preserved
+        assert _clean_order_id("DR-55") == "ORD-DR-55"
+
+    def test_check_order_status(self):
+        """Test order status lookups for known and unknown orders."""
+        result = check_order_status.invoke({"order_id": "ord-12345"})
+        assert result == (
+            "Order ORD-12345 is currently shipped. Tracking number: 1Z999AA1012345678 "
+            "Items: Smart TV 55-inch 4K Total: $699.99"
+        )
+
+        assert "couldn't find order ORD-00000" in check_order_status.invoke({"order_id": "00000"})
+
+    def test_bounded_memory_saver_evicts_oldest_thread(self):
+        """Test that the checkpointer drops the least recently used conversation."""
+        saver = BoundedMemorySaver(max_threads=2)
+        for thread_id in ("a", "b", "a", "c"):
+            config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+            saver.put(config, empty_checkpoint(), {}, {})
+
+        assert set(saver.storage) == {"a", "c"}
+
+
+class TestStatusCoalescer:
+    """Test suite for the executor's working-status throttling."""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_updates_within_interval(self):
+        """Test that only the first and latest updates in a burst are emitted."""
+        updater = Mock()
+        status = StatusCoalescer(updater, lambda text: text)
+
+        for content in ["one", "two", "three"]:
+            status.push(content)
+        status.flush()
+
+        emitted = [call.args[0].status.message for call in updater.event_queue.enqueue_event.call_args_list]
+        assert emitted == ["one", "three"]
+
+    @pytest.mark.asyncio
+    async def test_discard_drops_pending_update(self):
+        """Test that a terminal event drops the superseded working update."""
+        updater = Mock()
+        status = StatusCoalescer(updater, lambda text: text)
+
+        status.push("one")
+        status.push("two")
+        status.discard()
+        status.flush()
+
+        assert [call.args[0].status.message for call in updater.event_queue.enqueue_event.call_args_list] == ["one"]
@@ -4,9 +4,11 @@ Unit tests for the Host Agent.
 
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
+import asyncio
 import httpx
 
 from backend.agents.host_agent.agent import HostAgent
+from backend.utils.stream_events import StreamEvent
 
 
 class TestHostAgent:
@@ -88,6 +90,23 @@ class TestHostAgent:
             assert card is not None
             assert card.name == "Test Agent"
 
+    @pytest.mark.asyncio
+    async def test_get_agent_card_negative_cache(self, host_agent):
+        """Test that a failed card fetch is cached briefly and then retried."""
+        mock_client = AsyncMock()
+        mock_client.get = AsyncMock(side_effect=httpx.ConnectError("refused"))
+
+        with patch.object(host_agent, "_get_httpx_client", return_value=mock_client):
+            assert await host_agent._get_agent_card("http://localhost:8001") is None
+            assert await host_agent._get_agent_card("http://localhost:8001") is None
+            assert mock_client.get.await_count == 1
+
+            # Once the negative entry expires the card is fetched again
+            card, _ = host_agent._agent_cards["http://localhost:8001"]
+            host_agent._agent_cards["http://localhost:8001"] = (card, 0.0)
+            await host_agent._get_agent_card("http://localhost:8001")
+            assert mock_client.get.await_count == 2
+
     @pytest.mark.asyncio
     async def test_call_inventory_agent(self, host_agent, mock_a2a_client):
         """Test calling the inventory agent."""
@@ -104,6 +123,181 @@ class TestHostAgent:
 
             assert response == "Our store hours are 9-5"
 
+    @pytest.mark.asyncio
+    async def test_call_agent_reuses_cached_card(self, host_agent, mock_agent_card):
+        """Test that A2A calls build the client from the cached agent card."""
+        mock_client = Mock()
+        mock_client.send_message = AsyncMock(side_effect=Exception("boom"))
+
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=mock_agent_card) as mock_get_card,
+            patch("backend.agents.host_agent.agent.A2AClient", return_value=mock_client) as mock_client_cls,
+        ):
+            await host_agent.call_inventory_agent("Do you have widgets?", "test-context")
+
+        mock_get_card.assert_awaited_once_with(host_agent.INVENTORY_AGENT_URL)
+        assert mock_client_cls.call_args.kwargs["agent_card"] is mock_agent_card
+
+    @pytest.mark.asyncio
+    async def test_call_agent_extracts_response_text(self, host_agent, mock_agent_card):
+        """Test text extraction from task artifacts and surfacing of JSON-RPC errors."""
+        from a2a.types import (
+            Artifact,
+            JSONRPCError,
+            JSONRPCErrorResponse,
+            Part,
+            SendMessageResponse,
+            SendMessageSuccessResponse,
+            Task,
+            TaskState,
+            TaskStatus,
+            TextPart,
+        )
+
+        task = Task(
+            id="t1",
+            contextId="c1",
+            status=TaskStatus(state=TaskState.completed),
+            artifacts=[Artifact(artifactId="a1", parts=[Part(root=TextPart(text="Hours are 9-9"))])],
+        )
+        mock_client = Mock()
+        mock_client.send_message = AsyncMock(
+            side_effect=[
+                SendMessageResponse(root=SendMessageSuccessResponse(id="1", result=task)),
+                SendMessageResponse(
+                    root=JSONRPCErrorResponse(id="2", error=JSONRPCError(code=-32603, message="Internal error"))
+                ),
+            ]
+        )
+
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=mock_agent_card),
+            patch("backend.agents.host_agent.agent.A2AClient", return_value=mock_client),
+        ):
+            ok = await host_agent.call_customer_service_agent("What are your hours?", "c1")
+            failed = await host_agent.call_customer_service_agent("What are your hours?", "c1")
+
+        assert ok == "Hours are 9-9"
+        assert failed.startswith("Error communicating with agent:")
+        assert "Internal error" in failed
+
+    @pytest.mark.asyncio
+    async def test_call_agent_request_is_valid(self, host_agent, mock_agent_card):
+        """Test that the unvalidated outbound request serializes to a valid A2A request."""
+        from a2a.types import SendMessageRequest
+
+        mock_client = Mock()
+        mock_client.send_message = AsyncMock(return_value=Mock(root=Mock(result="Mock response")))
+
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=mock_agent_card),
+            patch("backend.agents.host_agent.agent.A2AClient", return_value=mock_client),
+        ):
+            await host_agent.call_customer_service_agent("What are your hours?", "c1")
+
+        payload = mock_client.send_message.call_args.args[0].model_dump(mode="json", exclude_none=True)
+        assert SendMessageRequest.model_validate(payload).model_dump(mode="json", exclude_none=True) == payload
+        assert payload["params"]["message"]["parts"] == [{"kind": "text", "text": "What are your hours?"}]
+        assert payload["params"]["configuration"]["acceptedOutputModes"] == ["text/plain", "text"]
+
+    @pytest.mark.asyncio
+    async def test_call_agent_times_out(self, host_agent, mock_agent_card):
+        """Test that a stalled agent is abandoned after the overall call timeout."""
+
+        async def stalled_send(request):
+            await asyncio.sleep(10)
+
+        mock_client = Mock()
+        mock_client.send_message = stalled_send
+        host_agent.A2A_CALL_TIMEOUT = 0.01
+
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=mock_agent_card),
+            patch("backend.agents.host_agent.agent.A2AClient", return_value=mock_client),
+        ):
+            response = await host_agent.call_customer_service_agent("What are your hours?", "c1")
+
+        assert "did not answer within" in response
+
+    @pytest.mark.asyncio
+    async def test_call_agent_logs_unexpected_errors_with_traceback(self, host_agent, caplog):
+        """Test that only unexpected failures are logged with a traceback."""
+        with patch.object(
+            host_agent, "_send_to_agent", side_effect=[httpx.ConnectError("refused"), ValueError("bad payload")]
+        ):
+            expected = await host_agent.call_customer_service_agent("What are your hours?", "c1")
+            unexpected = await host_agent.call_customer_service_agent("What are your hours?", "c1")
+
+        assert expected == "Error communicating with agent: refused"
+        assert unexpected == "Error communicating with agent: bad payload"
+        assert [(r.levelname, bool(r.exc_info)) for r in caplog.records] == [
+            ("WARNING", False),
+            ("ERROR", True),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_call_agent_offline(self, host_agent):
+        """Test that an unreachable agent is reported without attempting a send."""
+        with patch.object(host_agent, "_get_agent_card", return_value=None):
+            response = await host_agent.call_inventory_agent("Do you have widgets?", "test-context")
+
+        assert "unavailable" in response
+
+    @pytest.mark.asyncio
+    async def test_warmup_fetches_both_cards(self, host_agent):
+        """Test that warmup pre-fetches every remote agent card."""
+        with patch.object(host_agent, "_get_agent_card", return_value=None) as mock_get_card:
+            await host_agent.warmup()
+
+        fetched = {call.args[0] for call in mock_get_card.await_args_list}
+        assert fetched == {host_agent.INVENTORY_AGENT_URL, host_agent.CUSTOMER_SERVICE_AGENT_URL}
+
+    @pytest.mark.asyncio
+    async def test_inventory_responses_are_coalesced_and_cached(self, host_agent):
+        """Test that identical inventory calls share one request and later hits use the cache."""
+
+        async def slow_send(agent_url, query, context_id):
+            await asyncio.sleep(0.01)
+            return "Found 2 TVs"
+
+        with patch.object(host_agent, "_send_to_agent", side_effect=slow_send) as mock_send:
+            first, second = await asyncio.gather(
+                host_agent.call_inventory_agent("Find TVs", "ctx"),
+                host_agent.call_inventory_agent("Find TVs", "ctx"),
+            )
+            third = await host_agent.call_inventory_agent("Find TVs", "ctx")
+
+        assert first == second == third == "Found 2 TVs"
+        assert mock_send.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_inventory_call_survives_one_cancelled_caller(self, host_agent):
+        """Test that the shared send keeps running while another caller still awaits it."""
+
+        async def slow_send(agent_url, query, context_id):
+            await asyncio.sleep(0.01)
+            return "Found 2 TVs"
+
+        with patch.object(host_agent, "_send_to_agent", side_effect=slow_send) as mock_send:
+            dropped = asyncio.create_task(host_agent.call_inventory_agent("Find TVs", "ctx"))
+            kept = asyncio.create_task(host_agent.call_inventory_agent("Find TVs", "ctx"))
+            await asyncio.sleep(0)
+            dropped.cancel()
+
+            assert await kept == "Found 2 TVs"
+        assert dropped.cancelled()
+        assert mock_send.await_count == 1
+        assert not host_agent._inflight_waiters
+
+    @pytest.mark.asyncio
+    async def test_customer_service_responses_are_not_cached(self, host_agent):
+        """Test that calls to the stateful customer service agent always go out."""
+        with patch.object(host_agent, "_send_to_agent", return_value="Order shipped") as mock_send:
+            await host_agent.call_customer_service_agent("Where is ORD-12345?", "ctx")
+            await host_agent.call_customer_service_agent("Where is ORD-12345?", "ctx")
+
+        assert mock_send.await_count == 2
+
     @pytest.mark.asyncio
     async def test_call_agents_parallel(self, host_agent):
         """Test calling agents in parallel."""
@@ -119,6 +313,30 @@ class TestHostAgent:
                 assert responses["inventory"] == "Inventory response"
                 assert responses["customer_service"] == "Customer service response"
 
+    @pytest.mark.asyncio
+    async def test_call_agents_parallel_cancellation_cancels_both_calls(self, host_agent):
+        """Test that cancelling a parallel call also cancels both agent calls."""
+        cancelled = []
+
+        async def slow_call(query, context_id):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(query)
+                raise
+
+        with (
+            patch.object(host_agent, "call_inventory_agent", side_effect=slow_call),
+            patch.object(host_agent, "call_customer_service_agent", side_effect=slow_call),
+        ):
+            call = asyncio.create_task(host_agent.call_agents_parallel("inventory", "customer service", "c1"))
+            await asyncio.sleep(0.01)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+
+        assert sorted(cancelled) == ["customer service", "inventory"]
+
     @pytest.mark.asyncio
     async def test_get_agent_status(self, host_agent):
         """Test getting agent status."""
@@ -163,15 +381,307 @@ class TestHostAgent:
             assert len(responses) > 0
 
             # Should have at least status message
-            assert any(r.get("type") == "status" for r in responses)
+            assert any(r.type == "status" for r in responses)
 
             # Final response could be result or error based on routing
             final_response = responses[-1]
-            assert "type" in final_response
+            assert isinstance(final_response, StreamEvent)
             # Accept either result or specific error messages
-            assert final_response["type"] in ["result", "error"]
+            assert final_response.type in ["result", "error"]
+
+    @pytest.mark.asyncio
+    async def test_session_cache(self, host_agent):
+        """Test that repeat turns reuse the cached session."""
+        mock_session = Mock(id="session-1")
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=None)
+        host_agent._runner.session_service.create_session = AsyncMock(return_value=mock_session)
+
+        first = await host_agent._sessions.get_or_create("session-1")
+        second = await host_agent._sessions.get_or_create("session-1")
+
+        assert first is second is mock_session
+        host_agent._runner.session_service.get_session.assert_awaited_once()
+        host_agent._runner.session_service.create_session.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_get_agent_status_is_cached(self, host_agent, mock_agent_card):
+        """Test that status polls within the TTL reuse one probe."""
+        with patch.object(host_agent, "_get_agent_card", return_value=mock_agent_card) as mock_get_card:
+            first = await host_agent.get_agent_status()
+            second = await host_agent.get_agent_status()
+
+        assert first == second
+        assert mock_get_card.call_count == 2  # one probe, two agents
+
+    @pytest.mark.asyncio
+    async def test_stream_overlaps_card_checks_with_routing(self, host_agent):
+        """Test that agent cards are fetched while the router model is still running."""
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="s"))
+        card_fetch_started = asyncio.Event()
+
+        async def mock_get_card(url):
+            card_fetch_started.set()
+            return Mock(description="Test Description")
+
+        async def mock_run_async(*args, **kwargs):
+            # The router only answers once a card fetch is already in flight
+            await asyncio.wait_for(card_fetch_started.wait(), timeout=1)
+            yield Mock(content=Mock(parts=[Mock(text="ROUTE_TO_INVENTORY")]), is_final_response=Mock(return_value=True))
+
+        host_agent._runner.run_async = mock_run_async
+        with (
+            patch.object(host_agent, "_get_agent_card", side_effect=mock_get_card),
+            patch.object(host_agent, "call_inventory_agent", return_value="We have TVs"),
+        ):
+            responses = [r async for r in host_agent.stream("Any TVs?", "s")]
+
+        assert responses[-1] == StreamEvent("result", content="We have TVs")
+
+    @pytest.mark.asyncio
+    async def test_stream_speculative_inventory_call_cancelled_on_other_route(self, host_agent):
+        """Test that a speculative inventory call is dropped when the router picks another agent."""
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="s"))
+        inventory_cancelled = asyncio.Event()
+
+        async def slow_inventory_call(query, context_id):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                inventory_cancelled.set()
+                raise
+
+        async def mock_run_async(*args, **kwargs):
+            await asyncio.sleep(0.01)  # the router model takes a moment; the speculative call starts meanwhile
+            yield Mock(
+                content=Mock(parts=[Mock(text="ROUTE_TO_CUSTOMER_SERVICE")]), is_final_response=Mock(return_value=True)
+            )
+
+        host_agent._runner.run_async = mock_run_async
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=Mock(description="Test")),
+            patch.object(host_agent, "call_inventory_agent", side_effect=slow_inventory_call),
+            patch.object(host_agent, "call_customer_service_agent", return_value="Our hours are 9-9"),
+        ):
+            responses = [r async for r in host_agent.stream("Find me a smart TV", "s")]
+            await asyncio.wait_for(inventory_cancelled.wait(), timeout=1)
+
+        assert responses[-1] == StreamEvent("result", content="Our hours are 9-9")
+
+    @pytest.mark.asyncio
+    async def test_stream_speculative_inventory_send_cancelled_on_other_route(self, host_agent):
+        """Test that the outbound inventory send stops before the customer service agent is called."""
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="s"))
+        send_cancelled = asyncio.Event()
+
+        async def slow_send(agent_url, query, context_id):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                send_cancelled.set()
+                raise
+
+        async def mock_run_async(*args, **kwargs):
+            await asyncio.sleep(0.01)  # the router model takes a moment; the speculative call starts meanwhile
+            yield Mock(
+                content=Mock(parts=[Mock(text="ROUTE_TO_CUSTOMER_SERVICE")]), is_final_response=Mock(return_value=True)
+            )
+
+        async def customer_service_call(query, context_id):
+            # Only answers once the inventory send is gone, not when the stream finishes
+            await asyncio.wait_for(send_cancelled.wait(), timeout=0.5)
+            return "Our hours are 9-9"
+
+        host_agent._runner.run_async = mock_run_async
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=Mock(description="Test")),
+            patch.object(host_agent, "_send_to_agent", side_effect=slow_send) as mock_send,
+            patch.object(host_agent, "call_customer_service_agent", side_effect=customer_service_call),
+        ):
+            responses = [r async for r in host_agent.stream("Find me a smart TV", "s")]
+
+        assert responses[-1] == StreamEvent("result", content="Our hours are 9-9")
+        assert mock_send.await_args.args[0] == host_agent.INVENTORY_AGENT_URL
+        assert not host_agent._inflight
+
+    @pytest.mark.asyncio
+    async def test_stream_skips_speculative_call_when_routing_is_cached(self, host_agent):
+        """Test that no speculative inventory call starts when the router model is not consulted."""
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="s"))
+        host_agent._route_cache[("s", "find me a smart tv")] = "CUSTOMER_SERVICE"
+
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=Mock(description="Test")),
+            patch.object(host_agent, "call_inventory_agent") as mock_inventory,
+            patch.object(host_agent, "call_customer_service_agent", return_value="Our hours are 9-9"),
+        ):
+            responses = [r async for r in host_agent.stream("Find me a smart TV", "s")]
+
+        assert responses[-1] == StreamEvent("result", content="Our hours are 9-9")
+        mock_inventory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stream_both_yields_partial_results_in_completion_order(self, host_agent):
+        """Test that the faster agent's answer is streamed before the slower one finishes."""
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="s"))
+
+        async def slow_inventory_call(query, context_id):
+            await asyncio.sleep(0.05)
+            return "Inventory response"
+
+        async def mock_run_async(*args, **kwargs):
+            yield Mock(content=Mock(parts=[Mock(text="ROUTE_TO_BOTH")]), is_final_response=Mock(return_value=True))
+
+        host_agent._runner.run_async = mock_run_async
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=Mock(description="Test")),
+            patch.object(host_agent, "call_inventory_agent", side_effect=slow_inventory_call),
+            patch.object(host_agent, "call_customer_service_agent", return_value="Customer service response"),
+        ):
+            responses = [r async for r in host_agent.stream("Check my order and also suggest TVs", "s")]
+
+        partials = [r.agent for r in responses if r.type == "partial_result"]
+        assert partials == ["customer service", "inventory"]
+        assert "Inventory response" in responses[-1].content
+        assert "Customer service response" in responses[-1].content
+
+    @pytest.mark.asyncio
+    async def test_stream_reuses_routing_decision_for_repeated_query(self, host_agent):
+        """Test that a repeated query in the same session skips the router model."""
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="s"))
+        router_calls = 0
+
+        async def mock_run_async(*args, **kwargs):
+            nonlocal router_calls
+            router_calls += 1
+            yield Mock(
+                content=Mock(parts=[Mock(text="ROUTE_TO_CUSTOMER_SERVICE")]), is_final_response=Mock(return_value=True)
+            )
+
+        host_agent._runner.run_async = mock_run_async
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=Mock(description="Test")),
+            patch.object(host_agent, "call_customer_service_agent", return_value="Our hours are 9-9"),
+        ):
+            first = [r async for r in host_agent.stream("What are your hours?", "s")]
+            second = [r async for r in host_agent.stream("  what are   your HOURS? ", "s")]
+            [r async for r in host_agent.stream("What are your hours?", "other-session")]
+
+        assert first == second
+        assert router_calls == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_closes_router_run_after_decision(self, host_agent):
+        """Test that the router run is closed as soon as the routing decision arrives."""
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="s"))
+        run_closed = False
+
+        async def mock_run_async(*args, **kwargs):
+            nonlocal run_closed
+            try:
+                yield Mock(
+                    content=Mock(parts=[Mock(text="ROUTE_TO_INVENTORY")]), is_final_response=Mock(return_value=True)
+                )
+                yield Mock(content=None, is_final_response=Mock(return_value=False))
+            finally:
+                run_closed = True
+
+        # Hold a reference so the abandoned run isn't finalized by the garbage collector instead
+        runs = []
+        host_agent._runner.run_async = lambda *args, **kwargs: runs.append(mock_run_async()) or runs[-1]
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=Mock(description="Test")),
+            patch.object(host_agent, "call_inventory_agent", side_effect=lambda *args: run_closed and "closed"),
+        ):
+            responses = [r async for r in host_agent.stream("Any TVs?", "s")]
+
+        assert responses[-1] == StreamEvent("result", content="closed")
+
+    @pytest.mark.asyncio
+    async def test_stream_fast_routes_unambiguous_queries(self, host_agent):
+        """Test that clearly single-agent queries are routed without the router model."""
+        host_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="s"))
+        host_agent._runner.run_async = Mock()
+
+        with (
+            patch.object(host_agent, "_get_agent_card", return_value=Mock(description="Test")),
+            patch.object(host_agent, "call_customer_service_agent", return_value="Order ORD-12345 is shipped"),
+        ):
+            responses = [r async for r in host_agent.stream("Where is order ORD-12345?", "s")]
+
+        assert responses[-1] == StreamEvent("result", content="Order ORD-12345 is shipped")
+        host_agent._runner.run_async.assert_not_called()
 
     def test_supported_content_types(self, host_agent):
         """Test that supported content types are defined."""
         assert "text" in host_agent.SUPPORTED_CONTENT_TYPES
         assert "text/plain" in host_agent.SUPPORTED_CONTENT_TYPES
+
+
+class TestHostAgentExecutor:
+    """Test suite for HostAgentExecutor."""
+
+    def test_executors_share_one_agent(self):
+        """Test that every executor in the process reuses the same HostAgent."""
+        from backend.agents.host_agent.agent_executor import HostAgentExecutor
+
+        assert HostAgentExecutor().agent is HostAgentExecutor().agent
+
+    @pytest.mark.asyncio
+    async def test_execute_coalesces_progress_but_keeps_partial_results(self):
+        """Test that bursts of progress updates collapse while sub-agent answers all go out."""
+        from a2a.utils import get_message_text
+
+        from backend.agents.host_agent.agent_executor import HostAgentExecutor
+
+        async def mock_stream(query, context_id):
+            yield StreamEvent("status", message="Analyzing your request...")
+            yield StreamEvent("routing", agent="both", message="Coordinating...")
+            yield StreamEvent("status", message="Waiting for agents...")
+            yield StreamEvent("partial_result", agent="customer service", content="Hours are 9-9")
+            yield StreamEvent("partial_result", agent="inventory", content="3 TVs in stock")
+            yield StreamEvent("agent_response", agent="parallel")
+            yield StreamEvent("result", content="Combined answer")
+
+        executor = HostAgentExecutor()
+        executor.agent = Mock(stream=mock_stream)
+        context = Mock(current_task=Mock(id="t1", contextId="c1"))
+        context.get_user_input.return_value = "Hours and TVs?"
+
+        with patch("backend.agents.host_agent.agent_executor.TaskUpdater") as mock_updater_cls:
+            await executor.execute(context, Mock())
+            # Let the cancelled flush timer unwind
+            await asyncio.sleep(0)
+
+        updater = mock_updater_cls.return_value
+        statuses = [
+            get_message_text(call.args[0].status.message) for call in updater.event_queue.enqueue_event.call_args_list
+        ]
+        assert statuses == [
+            "Analyzing your request...",
+            "Waiting for agents...",
+            "Response from customer service agent:\nHours are 9-9",
+            "Response from inventory agent:\n3 TVs in stock",
+            "Received response from parallel agent",
+        ]
+        updater.complete.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_execute_serializes_structured_result_as_json(self):
+        """Test that a non-string result reaches the artifact as JSON, not a Python repr."""
+        import json
+
+        from backend.agents.host_agent.agent_executor import HostAgentExecutor
+
+        async def fake_stream(query, context_id):
+            yield StreamEvent("result", content={"products": [{"name": "Smart TV", "in_stock": True}]})
+
+        executor = HostAgentExecutor()
+        executor.agent = Mock(stream=fake_stream)
+        context = Mock(current_task=Mock(id="t1", contextId="c1"))
+        context.get_user_input.return_value = "smart tvs"
+
+        with patch("backend.agents.host_agent.agent_executor.TaskUpdater") as mock_updater_cls:
+            await executor.execute(context, Mock())
+
+        (parts,), _ = mock_updater_cls.return_value.add_artifact.call_args
+        assert json.loads(parts[0].root.text) == {"products": [{"name": "Smart TV", "in_stock": True}]}
@@ -8,7 +8,11 @@ import asyncio
 
 from backend.agents.host_agent.agent import HostAgent
 from backend.agents.inventory_agent_a2a.agent import InventoryAgent
-from backend.agents.customer_service_a2a.agent import CustomerServiceAgent
+from backend.agents.customer_service_a2a.agent import AgentEvent, CustomerServiceAgent
+from backend.utils.a2a_server import FastA2AStarletteApplication
+from backend.utils.session_cache import SessionCache
+from backend.utils.singleton import LazySingleton
+from backend.utils.task_store import LruTaskStore
 
 
 class TestAgentIntegration:
@@ -134,8 +138,8 @@ class TestAgentIntegration:
                     events.append(event)
 
                 assert len(events) >= 2  # At least status and result
-                assert any(e.get("type") == "status" for e in events)
-                assert any(e.get("type") == "result" for e in events)
+                assert any(e.type == "status" for e in events)
+                assert any(e.type == "result" for e in events)
 
     @pytest.mark.asyncio
     async def test_customer_service_agent_stream(self):
@@ -149,7 +153,7 @@ class TestAgentIntegration:
 
             cs_agent.graph.astream = mock_astream
             cs_agent.get_agent_response = Mock(
-                return_value={"is_task_complete": True, "content": "30-day return policy with receipt"}
+                return_value=AgentEvent("30-day return policy with receipt", is_task_complete=True)
             )
 
             events = []
@@ -158,8 +162,8 @@ class TestAgentIntegration:
 
             assert len(events) >= 2
             final_event = events[-1]
-            assert final_event["is_task_complete"] is True
-            assert "30-day" in final_event["content"]
+            assert final_event.is_task_complete is True
+            assert "30-day" in final_event.content
 
     @pytest.mark.asyncio
     async def test_agent_status_check(self):
@@ -206,3 +210,161 @@ class TestAgentIntegration:
             assert events[1]["type"] == "tool_call"
             assert events[2]["type"] == "result"
             assert "5 products" in events[2]["content"]
+
+    def test_cached_agent_card_endpoint(self):
+        """Test that the pre-serialized agent card is served intact."""
+        from a2a.types import AgentCapabilities, AgentCard
+        from starlette.testclient import TestClient
+
+        card = AgentCard(
+            name="Test Agent",
+            description="Test agent",
+            url="http://localhost:9999/",
+            version="1.0.0",
+            defaultInputModes=["text"],
+            defaultOutputModes=["text"],
+            capabilities=AgentCapabilities(streaming=True),
+            skills=[],
+        )
+        app = FastA2AStarletteApplication(agent_card=card, http_handler=Mock())
+
+        response = TestClient(app.build()).get("/.well-known/agent.json")
+
+        assert response.status_code == 200
+        assert AgentCard(**response.json()) == card
+
+    def test_fast_app_encodes_results_like_stock_app(self):
+        """Test that direct JSON-RPC encoding matches the stock response body."""
+        import json
+
+        from a2a.server.apps import A2AStarletteApplication
+        from a2a.types import (
+            AgentCapabilities,
+            AgentCard,
+            DataPart,
+            Message,
+            Part,
+            Role,
+            SendMessageResponse,
+            SendMessageSuccessResponse,
+        )
+
+        card = AgentCard(
+            name="Test Agent",
+            description="Test agent",
+            url="http://localhost:9999/",
+            version="1.0.0",
+            defaultInputModes=["text"],
+            defaultOutputModes=["text"],
+            capabilities=AgentCapabilities(),
+            skills=[],
+        )
+        result = SendMessageResponse(
+            root=SendMessageSuccessResponse(
+                id="1",
+                result=Message(
+                    messageId="m1",
+                    role=Role.agent,
+                    parts=[Part(root=DataPart(data={"products": [{"id": "PROD-001", "price": 699.99}]}))],
+                ),
+            )
+        )
+
+        fast = FastA2AStarletteApplication(agent_card=card, http_handler=Mock())._create_response(result)
+        stock = A2AStarletteApplication(agent_card=card, http_handler=Mock())._create_response(result)
+
+        assert json.loads(fast.body) == json.loads(stock.body)
+
+    def test_fast_app_build_runs_user_lifespan(self):
+        """Test that the fast app still runs a caller-supplied lifespan around serving."""
+        import contextlib
+
+        from a2a.types import AgentCapabilities, AgentCard
+        from starlette.testclient import TestClient
+
+        card = AgentCard(
+            name="Test Agent",
+            description="Test agent",
+            url="http://localhost:9999/",
+            version="1.0.0",
+            defaultInputModes=["text"],
+            defaultOutputModes=["text"],
+            capabilities=AgentCapabilities(),
+            skills=[],
+        )
+        phases = []
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            phases.append("startup")
+            yield
+            phases.append("shutdown")
+
+        app = FastA2AStarletteApplication(agent_card=card, http_handler=Mock()).build(lifespan=lifespan)
+        with TestClient(app) as client:
+            assert client.get("/.well-known/agent.json").status_code == 200
+
+        assert phases == ["startup", "shutdown"]
+
+    def test_fast_app_build_forwards_positional_urls(self):
+        """Test that a positional agent card URL reaches the stock build, not the lifespan slot."""
+        from a2a.types import AgentCapabilities, AgentCard
+        from starlette.testclient import TestClient
+
+        card = AgentCard(
+            name="Test Agent",
+            description="Test agent",
+            url="http://localhost:9999/",
+            version="1.0.0",
+            defaultInputModes=["text"],
+            defaultOutputModes=["text"],
+            capabilities=AgentCapabilities(),
+            skills=[],
+        )
+
+        app = FastA2AStarletteApplication(agent_card=card, http_handler=Mock()).build("/card.json")
+        with TestClient(app) as client:
+            assert client.get("/card.json").status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_lru_task_store_evicts_least_recently_used(self):
+        """Test that the bounded task store drops the least recently used task when full."""
+        from a2a.types import Task, TaskState, TaskStatus
+
+        def make_task(task_id):
+            return Task(id=task_id, contextId="ctx", status=TaskStatus(state=TaskState.completed))
+
+        store = LruTaskStore(max_size=2)
+        await store.save(make_task("t1"))
+        await store.save(make_task("t2"))
+        assert (await store.get("t1")).id == "t1"
+
+        await store.save(make_task("t3"))
+
+        assert await store.get("t2") is None
+        assert await store.get("t1") is not None
+        assert await store.get("t3") is not None
+
+    @pytest.mark.asyncio
+    async def test_session_cache_evicts_least_recently_used(self):
+        """Test that the session cache asks the service again only for evicted sessions."""
+        service = Mock()
+        service.get_session = AsyncMock(side_effect=lambda app_name, user_id, session_id: Mock(id=session_id))
+        cache = SessionCache(service, "app", "user", max_size=2)
+
+        await cache.get_or_create("s1")
+        await cache.get_or_create("s2")
+        await cache.get_or_create("s1")
+        await cache.get_or_create("s3")
+        assert service.get_session.await_count == 3
+
+        await cache.get_or_create("s2")
+        assert service.get_session.await_count == 4
+
+    def test_lazy_singleton_builds_once(self):
+        """Test that the lazy singleton calls its factory only on the first get()."""
+        factory = Mock(side_effect=object)
+        singleton = LazySingleton(factory)
+
+        assert singleton.get() is singleton.get()
+        factory.assert_called_once()
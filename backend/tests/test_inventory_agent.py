@@ -2,10 +2,13 @@
 Unit tests for the Inventory Agent A2A.
 """
 
+import logging
+
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 
 from backend.agents.inventory_agent_a2a.agent import InventoryAgent
+from backend.utils.vector_search_store import VertexSearchStore
 
 
 class TestInventoryAgent:
@@ -46,14 +49,31 @@ class TestInventoryAgent:
         assert "get_low_stock_items" in tool_names
         assert "get_all_products" in tool_names
 
-    def test_check_product_availability_success(self, inventory_agent):
+    @pytest.mark.asyncio
+    async def test_tools_run_off_the_event_loop(self, inventory_agent, mock_vector_store):
+        """Test that tools are coroutines whose blocking store calls run in a worker thread."""
+        import inspect
+        import threading
+
+        search_threads = []
+        mock_vector_store.search.side_effect = lambda **kwargs: search_threads.append(threading.get_ident()) or []
+        agent = inventory_agent._build_agent()
+        search_tool = next(t for t in agent.tools if t.__name__ == "search_products_by_query")
+
+        assert all(inspect.iscoroutinefunction(tool) for tool in agent.tools)
+        assert list(inspect.signature(search_tool).parameters) == ["query"]
+        assert (await search_tool("smart tv"))["status"] == "success"
+        assert search_threads and search_threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_check_product_availability_success(self, inventory_agent):
         """Test checking product availability for existing product."""
         # Get the tool directly
         agent = inventory_agent._build_agent()
         check_tool = next(t for t in agent.tools if t.__name__ == "check_product_availability")
 
         # Execute the tool
-        result = check_tool("PROD-001")
+        result = await check_tool("PROD-001")
 
         # Verify the result matches actual implementation
         assert result["status"] == "success"
@@ -64,23 +84,53 @@ class TestInventoryAgent:
         assert "price" in result
         assert "stock_status" in result
 
-    def test_check_product_availability_not_found(self, inventory_agent):
+    @pytest.mark.asyncio
+    async def test_check_product_availability_not_found(self, inventory_agent):
         """Test checking availability for non-existent product."""
         agent = inventory_agent._build_agent()
         check_tool = next(t for t in agent.tools if t.__name__ == "check_product_availability")
 
-        result = check_tool("PROD-999")
+        result = await check_tool("PROD-999")
 
         assert result["status"] == "error"
         assert "error_message" in result
         assert "not found" in result["error_message"].lower()
 
-    def test_search_products_by_query(self, inventory_agent):
+    @pytest.mark.asyncio
+    async def test_check_product_availability_by_sku(self, inventory_agent):
+        """Test that a SKU (any case) finds the product when no ID matches."""
+        agent = inventory_agent._build_agent()
+        check_tool = next(t for t in agent.tools if t.__name__ == "check_product_availability")
+
+        result = await check_tool("tv-55-4k-001")
+
+        assert result["status"] == "success"
+        assert result["product_id"] == "PROD-001"
+
+    @pytest.mark.asyncio
+    async def test_check_product_availability_null_stock(self, inventory_agent, mock_vector_store):
+        """Test that a product with a null stock quantity is reported as unavailable."""
+        mock_vector_store.get_by_id.side_effect = lambda product_id: {
+            "id": product_id,
+            "name": "Mystery Box",
+            "stock_quantity": None,
+        }
+        agent = inventory_agent._build_agent()
+        check_tool = next(t for t in agent.tools if t.__name__ == "check_product_availability")
+
+        result = await check_tool("PROD-404")
+
+        assert result["status"] == "success"
+        assert result["available"] is False
+        assert result["stock_quantity"] == 0
+
+    @pytest.mark.asyncio
+    async def test_search_products_by_query(self, inventory_agent):
         """Test searching products by query."""
         agent = inventory_agent._build_agent()
         search_tool = next(t for t in agent.tools if t.__name__ == "search_products_by_query")
 
-        result = search_tool("smart tv")
+        result = await search_tool("smart tv")
 
         assert result["status"] == "success"
         assert "products" in result
@@ -88,7 +138,8 @@ class TestInventoryAgent:
         assert len(result["products"]) == 2
         assert result["total_count"] == 2
 
-    def test_search_products_by_category(self, inventory_agent):
+    @pytest.mark.asyncio
+    async def test_search_products_by_category(self, inventory_agent):
         """Test searching products by category."""
         # Mock the search to return electronics items
         mock_vector_store = inventory_agent._search_store
@@ -111,36 +162,74 @@ class TestInventoryAgent:
         agent = inventory_agent._build_agent()
         category_tool = next(t for t in agent.tools if t.__name__ == "search_products_by_category")
 
-        result = category_tool("electronics")
+        result = await category_tool("electronics")
 
         assert result["status"] == "success"
         assert len(result["products"]) > 0
         assert result["total_count"] == len(result["products"])
 
-    def test_search_products_by_price_range(self, inventory_agent):
+    @pytest.mark.asyncio
+    async def test_search_products_by_price_range(self, inventory_agent):
         """Test searching products by price range."""
         agent = inventory_agent._build_agent()
         price_tool = next(t for t in agent.tools if t.__name__ == "search_products_by_price_range")
 
-        result = price_tool(100.0, 1000.0)
+        result = await price_tool(100.0, 1000.0)
 
         assert result["status"] == "success"
         assert "products" in result
         assert "total_count" in result
 
-    def test_get_low_stock_items(self, inventory_agent):
+    @pytest.mark.asyncio
+    async def test_price_filter_treats_missing_prices_as_zero(self, inventory_agent, mock_vector_store):
+        """Test that hits with a null or missing price count as priced 0 instead of failing the search."""
+        hits = mock_vector_store.search.return_value
+        no_price = {k: v for k, v in hits[0].items() if k != "price"}
+        mock_vector_store.search.return_value = [{**hits[0], "price": None}, {**no_price, "id": "PROD-003"}, hits[1]]
+        agent = inventory_agent._build_agent()
+        price_tool = next(t for t in agent.tools if t.__name__ == "search_products_by_price_range")
+
+        result = await price_tool(0.0, 2000.0)
+
+        assert result["status"] == "success"
+        assert [(p["id"], p["price"]) for p in result["products"]] == [
+            ("PROD-001", 0),
+            ("PROD-003", 0),
+            ("PROD-002", 1299.99),
+        ]
+        assert [p["id"] for p in (await price_tool(100.0, 2000.0))["products"]] == ["PROD-002"]
+
+    @pytest.mark.asyncio
+    async def test_nested_and_flat_hits_project_the_same(self, inventory_agent, mock_vector_store):
+        """Test that tools read product fields from nested metadata and flat hits alike."""
+        flat = mock_vector_store.search.return_value[0]
+        nested = {"id": flat["id"], "metadata": {k: v for k, v in flat.items() if k != "id"}}
+        agent = inventory_agent._build_agent()
+        price_tool = next(t for t in agent.tools if t.__name__ == "search_products_by_price_range")
+
+        mock_vector_store.search.return_value = [flat]
+        from_flat = await price_tool(100.0, 1000.0)
+        mock_vector_store.search.return_value = [nested]
+        from_nested = await price_tool(100.0, 1000.0)
+
+        assert from_flat == from_nested
+        assert from_flat["products"][0]["sku"] == "TV-55-4K-001"
+
+    @pytest.mark.asyncio
+    async def test_get_low_stock_items(self, inventory_agent):
         """Test getting low stock items."""
         agent = inventory_agent._build_agent()
         low_stock_tool = next(t for t in agent.tools if t.__name__ == "get_low_stock_items")
 
-        result = low_stock_tool(10)
+        result = await low_stock_tool(10)
 
         assert result["status"] == "success"
         assert "products" in result
         assert "threshold" in result
         assert result["threshold"] == 10
 
-    def test_search_products_empty_results(self, inventory_agent, mock_vector_store):
+    @pytest.mark.asyncio
+    async def test_search_products_empty_results(self, inventory_agent, mock_vector_store):
         """Test searching products with no results."""
         # Override the mock to return empty results
         mock_vector_store.search.return_value = []
@@ -148,13 +237,14 @@ class TestInventoryAgent:
         agent = inventory_agent._build_agent()
         search_tool = next(t for t in agent.tools if t.__name__ == "search_products_by_query")
 
-        result = search_tool("nonexistent product")
+        result = await search_tool("nonexistent product")
 
         assert result["status"] == "success"
         assert result["products"] == []
         assert result["total_count"] == 0
 
-    def test_search_error_handling(self, inventory_agent, mock_vector_store):
+    @pytest.mark.asyncio
+    async def test_search_error_handling(self, inventory_agent, mock_vector_store):
         """Test error handling in search operations."""
         # Make the search raise an exception
         mock_vector_store.search.side_effect = Exception("Database connection error")
@@ -162,7 +252,7 @@ class TestInventoryAgent:
         agent = inventory_agent._build_agent()
         search_tool = next(t for t in agent.tools if t.__name__ == "search_products_by_query")
 
-        result = search_tool("test query")
+        result = await search_tool("test query")
 
         assert result["status"] == "error"
         assert "error_message" in result
@@ -191,7 +281,21 @@ class TestInventoryAgent:
 
         assert len(events) >= 1
         # Should have at least a status message
-        assert any(event.get("type") == "status" for event in events)
+        assert any(event.type == "status" for event in events)
+
+    @pytest.mark.asyncio
+    async def test_session_cache(self, inventory_agent):
+        """Test that repeat turns reuse the cached session."""
+        mock_session = Mock(id="session-1")
+        inventory_agent._runner.session_service.get_session = AsyncMock(return_value=None)
+        inventory_agent._runner.session_service.create_session = AsyncMock(return_value=mock_session)
+
+        first = await inventory_agent._sessions.get_or_create("session-1")
+        second = await inventory_agent._sessions.get_or_create("session-1")
+
+        assert first is second is mock_session
+        inventory_agent._runner.session_service.get_session.assert_awaited_once()
+        inventory_agent._runner.session_service.create_session.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_stream_with_tool_calls(self, inventory_agent):
@@ -223,14 +327,146 @@ class TestInventoryAgent:
             events.append(event)
 
         # Should have tool call event
-        tool_events = [e for e in events if e.get("type") == "tool_call"]
+        tool_events = [e for e in events if e.type == "tool_call"]
         assert len(tool_events) > 0
 
         # Should have final result
-        result_events = [e for e in events if e.get("type") == "result"]
+        result_events = [e for e in events if e.type == "result"]
         assert len(result_events) == 1
 
+    @pytest.mark.asyncio
+    async def test_stream_forwards_interim_text(self, inventory_agent):
+        """Test that model text before the final response is streamed as partial events."""
+        inventory_agent._runner.session_service.get_session = AsyncMock(return_value=Mock(id="test-session"))
+
+        async def mock_run_async(*args, **kwargs):
+            yield Mock(
+                content=Mock(parts=[Mock(text="Let me look that up.", function_call=None)]),
+                is_final_response=Mock(return_value=False),
+            )
+            yield Mock(
+                content=Mock(parts=[Mock(text="Found 3 products", function_call=None)]),
+                is_final_response=Mock(return_value=True),
+            )
+
+        inventory_agent._runner.run_async = mock_run_async
+
+        events = [event async for event in inventory_agent.stream("Search for laptops", "test-session")]
+
+        assert [e.type for e in events] == ["status", "partial", "result"]
+        assert events[1].content == "Let me look that up."
+        assert events[2].content == "Found 3 products"
+
     def test_supported_content_types(self, inventory_agent):
         """Test that supported content types are defined."""
         assert "text" in inventory_agent.SUPPORTED_CONTENT_TYPES
         assert "text/plain" in inventory_agent.SUPPORTED_CONTENT_TYPES
+
+
+class TestInventoryAgentExecutor:
+    """Test suite for InventoryAgentExecutor."""
+
+    @pytest.mark.asyncio
+    async def test_execute_sends_progress_directly_and_completes(self):
+        """Test that progress goes straight onto the event queue and the result completes the task."""
+        from a2a.utils import get_message_text
+
+        from backend.agents.inventory_agent_a2a.agent_executor import InventoryAgentExecutor
+        from backend.utils.stream_events import StreamEvent
+
+        async def mock_stream(query, context_id):
+            yield StreamEvent("status", message="Searching inventory database...")
+            yield StreamEvent("tool_call", tool_name="search_products_by_query", message="Searching...")
+            yield StreamEvent("result", content={"products": []})
+
+        with patch("backend.agents.inventory_agent_a2a.agent_executor._get_agent"):
+            executor = InventoryAgentExecutor()
+        executor.agent = Mock(stream=mock_stream)
+        context = Mock(current_task=Mock(id="t1", contextId="c1"))
+        context.get_user_input.return_value = "Any TVs?"
+
+        with patch("backend.agents.inventory_agent_a2a.agent_executor.TaskUpdater") as mock_updater_cls:
+            await executor.execute(context, Mock())
+
+        updater = mock_updater_cls.return_value
+        events = [call.args[0] for call in updater.event_queue.enqueue_event.call_args_list]
+        assert [get_message_text(e.status.message) for e in events] == [
+            "Searching inventory database...",
+            "Calling search_products_by_query: Searching...",
+        ]
+        updater.update_status.assert_not_called()
+        (parts,), _ = updater.add_artifact.call_args
+        assert parts[0].root.data == {"products": []}
+        updater.complete.assert_called_once()
+
+
+class TestVertexSearchStore:
+    """Test suite for the VertexSearchStore helper."""
+
+    @pytest.fixture
+    def search_store(self, mock_vector_store):
+        """Create a VertexSearchStore whose search call returns canned products."""
+        with patch("backend.utils.vector_search_store.de.SearchServiceClient"):
+            store = VertexSearchStore(serving_config="projects/test/servingConfigs/test")
+        store.search = Mock(wraps=mock_vector_store.search)
+        return store
+
+    def test_get_by_id_reuses_catalog_index(self, search_store):
+        """Test that ID lookups share one catalog fetch until the index expires."""
+        assert search_store.get_by_id("PROD-001")["name"] == "Smart TV 55-inch 4K"
+        assert search_store.get_by_id("PROD-002")["name"] == "Smart TV 65-inch OLED"
+        assert search_store.get_by_id("PROD-999") is None
+        assert search_store.search.call_count == 1
+
+        search_store._catalog_expires = 0.0
+        search_store.get_by_id("PROD-001")
+        assert search_store.search.call_count == 2
+
+    def test_get_by_sku_is_case_insensitive_and_shares_the_catalog(self, search_store):
+        """Test that SKU lookups ignore case and reuse the catalog snapshot behind get_by_id."""
+        assert search_store.get_by_sku("tv-65-oled-001")["id"] == "PROD-002"
+        assert search_store.get_by_id("PROD-001")["sku"] == "TV-55-4K-001"
+        assert search_store.get_by_sku("NO-SUCH-SKU") is None
+        assert search_store.search.call_count == 1
+
+    def test_get_low_stock_bisects_the_catalog_snapshot(self, search_store, mock_vector_store):
+        """Test that low-stock lookups come sorted from the snapshot and skip null or zero stock."""
+        hits = mock_vector_store.search.return_value
+        mock_vector_store.search.return_value = [
+            *hits,
+            {**hits[0], "id": "PROD-003", "sku": "TV-NULL", "stock_quantity": None},
+            {**hits[0], "id": "PROD-004", "sku": "TV-ZERO", "stock_quantity": 0},
+        ]
+
+        assert [p["id"] for p in search_store.get_low_stock(20)] == ["PROD-002", "PROD-001"]
+        assert [p["id"] for p in search_store.get_low_stock(10)] == ["PROD-002"]
+        assert search_store.get_low_stock(8) == []
+        assert search_store.search.call_count == 1
+
+    def test_catalog_snapshot_warns_when_it_hits_the_size_cap(self, search_store, mock_vector_store, caplog):
+        """Test that a full catalog snapshot is logged, since products past the cap are missed."""
+        search_store.CATALOG_SIZE = 2
+
+        with caplog.at_level(logging.WARNING, logger="backend.utils.vector_search_store"):
+            search_store.get_low_stock(20)
+
+        search_store.search.assert_called_once_with(query="", top_k=2)
+        assert "2-product cap" in caplog.text
+
+    def test_search_caches_identical_queries(self, mock_vector_store):
+        """Test that repeated identical searches hit the service once until the cache is cleared."""
+        with patch("backend.utils.vector_search_store.de.SearchServiceClient"):
+            store = VertexSearchStore(serving_config="projects/test/servingConfigs/test")
+        store._search = Mock(side_effect=lambda query, top_k: mock_vector_store.search())
+
+        first = store.search("smart tv", top_k=5)
+        first.clear()
+        assert len(store.search("smart tv", top_k=5)) == 2
+        assert store._search.call_count == 1
+
+        store.search("smart tv", top_k=10)
+        assert store._search.call_count == 2
+
+        store.clear_cache()
+        store.search("smart tv", top_k=5)
+        assert store._search.call_count == 3
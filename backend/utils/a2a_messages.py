@@ -0,0 +1,68 @@
+"""
+a2a_messages.py
+~~~~~~~~~~~~~~~
+Builders for the agent messages A2A executors emit on every stream event.
+
+``new_agent_text_message`` validates a fresh ``TextPart``/``Part``/``Message``
+each time, although every field is produced by our own code. These helpers
+build the same objects with ``model_construct``, skipping the re-validation.
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from typing import Any
+
+from a2a.types import Message, Part, Role, TaskState, TaskStatus, TaskStatusUpdateEvent, TextPart
+
+try:  # orjson is an optional speedup; the stdlib encoder produces the same JSON text
+    import orjson
+
+    def _dumps(content: Any) -> str:
+        return orjson.dumps(content, default=str).decode()
+
+except ImportError:
+
+    def _dumps(content: Any) -> str:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def text_part(text: str) -> Part:
+    """Wrap internally produced text in a Part, skipping pydantic validation."""
+    return Part.model_construct(root=TextPart.model_construct(text=text))
+
+
+def agent_message(part: Part, context_id: str, task_id: str) -> Message:
+    """Build a single-part agent message without re-validating it."""
+    return Message.model_construct(
+        role=Role.agent,
+        parts=[part],
+        messageId=str(uuid.uuid4()),
+        taskId=task_id,
+        contextId=context_id,
+    )
+
+
+def agent_text_message(text: str, context_id: str, task_id: str) -> Message:
+    """Build an agent text message like ``new_agent_text_message`` without re-validating it."""
+    return agent_message(text_part(text), context_id, task_id)
+
+
+def status_event(
+    task_id: str, context_id: str, state: TaskState, message: Message | None = None, final: bool = False
+) -> TaskStatusUpdateEvent:
+    """Build the event ``TaskUpdater.update_status`` would enqueue, without re-validating it."""
+    return TaskStatusUpdateEvent.model_construct(
+        taskId=task_id,
+        contextId=context_id,
+        final=final,
+        status=TaskStatus.model_construct(state=state, message=message),
+    )
+
+
+def result_text(content: Any) -> str:
+    """Render a result payload as text: strings pass through, anything else becomes JSON."""
+    if isinstance(content, str):
+        return content
+    return _dumps(content)
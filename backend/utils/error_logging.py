@@ -0,0 +1,14 @@
+"""
+error_logging.py
+~~~~~~~~~~~~~~~~
+Shared switch for how much detail the agents' error logs carry.
+
+Full tracebacks are opt-in (``A2A_VERBOSE_ERRORS=1``) so a failure storm doesn't also
+become a logging storm. Expected failures log with ``exc_info=VERBOSE_ERRORS``.
+"""
+
+from __future__ import annotations
+
+import os
+
+VERBOSE_ERRORS = os.getenv("A2A_VERBOSE_ERRORS") == "1"
@@ -0,0 +1,63 @@
+"""
+session_cache.py
+~~~~~~~~~~~~~~~~
+Size-bounded cache of ADK runner sessions.
+
+Agents only need a session's id after looking it up (the runner reloads the session
+itself), so a cached handle stays valid for as long as the in-memory session service
+keeps it. ``SessionCache`` answers repeat turns locally and only asks the service on a
+miss, evicting the least recently used handle beyond ``max_size``.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from google.adk.sessions import BaseSessionService, Session
+
+# Default number of session handles an agent keeps in front of its session service.
+DEFAULT_SESSION_CACHE_SIZE = 1024
+
+
+class SessionCache:
+    """LRU of runner sessions for one app and user, backed by ``session_service``."""
+
+    def __init__(
+        self,
+        session_service: BaseSessionService,
+        app_name: str,
+        user_id: str,
+        max_size: int = DEFAULT_SESSION_CACHE_SIZE,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.session_service = session_service
+        self.app_name = app_name
+        self.user_id = user_id
+        self.max_size = max_size
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+
+    async def get_or_create(self, session_id: str) -> Session:
+        """Return the session, hitting the session service only on a local cache miss."""
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            return session
+
+        session = await self.session_service.get_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=session_id,
+        )
+        if session is None:
+            session = await self.session_service.create_session(
+                app_name=self.app_name,
+                user_id=self.user_id,
+                state={},
+                session_id=session_id,
+            )
+
+        self._sessions[session_id] = session
+        if len(self._sessions) > self.max_size:
+            self._sessions.popitem(last=False)
+        return session
@@ -0,0 +1,34 @@
+"""
+singleton.py
+~~~~~~~~~~~~
+Lazily created, process-wide instances.
+
+Each agent server builds one agent (model client, runner, caches) and shares it
+between executors. ``LazySingleton`` creates it on first use; the lock makes
+concurrent first calls from worker threads build it only once.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LazySingleton(Generic[T]):
+    """Instance built by ``factory`` on the first ``get()`` and reused afterwards."""
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._instance: T | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """Return the instance, creating it on first use."""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
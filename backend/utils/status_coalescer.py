@@ -0,0 +1,95 @@
+"""
+status_coalescer.py
+~~~~~~~~~~~~~~~~~~~
+Throttle for the working-state updates A2A executors send while an agent streams.
+
+Agent streams can emit progress events much faster than a client can usefully
+render them, and every update is a queue write plus an SSE frame. The first
+update goes out immediately; updates arriving within the flush interval replace
+each other and only the latest is emitted when the interval elapses.
+
+Updates go out through ``StatusSender``, which enqueues pre-built status events
+straight onto the task's event queue rather than through
+``TaskUpdater.update_status``, which validates a new event and status model for
+every update. ``TaskUpdater`` is still used for the terminal operations.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Message, TaskState
+
+from backend.utils.a2a_messages import status_event
+
+# Minimum spacing between consecutive working-state updates for one task.
+STATUS_FLUSH_INTERVAL = 0.05
+
+
+@dataclass(slots=True, frozen=True)
+class StatusSender:
+    """Enqueue one task's working-state updates directly on its event queue."""
+
+    queue: EventQueue
+    task_id: str
+    context_id: str
+
+    @classmethod
+    def for_updater(cls, updater: TaskUpdater) -> StatusSender:
+        return cls(updater.event_queue, updater.task_id, updater.context_id)
+
+    def send(self, message: Message) -> None:
+        self.queue.enqueue_event(status_event(self.task_id, self.context_id, TaskState.working, message))
+
+
+class StatusCoalescer:
+    """Coalesce one task's working-state updates to at most one per flush interval."""
+
+    def __init__(self, updater: TaskUpdater, make_msg: Callable[[str], Message]) -> None:
+        self._sender = StatusSender.for_updater(updater)
+        self._make_msg = make_msg
+        self._pending: str | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    def push(self, content: str) -> None:
+        """Queue a working-state message, emitting it now if no flush is scheduled."""
+        if self._flush_task is None:
+            self._emit(content)
+            self._flush_task = asyncio.create_task(self._flush_later())
+        else:
+            self._pending = content
+
+    def send(self, content: str) -> None:
+        """Emit any pending message, then this one right away; for updates that must not be dropped."""
+        self.flush()
+        self._emit(content)
+
+    def discard(self) -> None:
+        """Cancel the timer and drop any pending message; a terminal event supersedes it."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._pending = None
+
+    def flush(self) -> None:
+        """Cancel the timer and emit any pending message."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._pending is not None:
+            content, self._pending = self._pending, None
+            self._emit(content)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(STATUS_FLUSH_INTERVAL)
+        self._flush_task = None
+        if self._pending is not None:
+            content, self._pending = self._pending, None
+            self._emit(content)
+
+    def _emit(self, content: str) -> None:
+        self._sender.send(self._make_msg(content))
@@ -0,0 +1,28 @@
+"""
+stream_events.py
+~~~~~~~~~~~~~~~~
+Event type yielded by the host and inventory agents' ``stream`` methods.
+
+A stream can emit many small progress events per request. Like the customer
+service agent's ``AgentEvent``, these are NamedTuples, so they are smaller
+than the equivalent dicts and their fields are read as attributes.
+"""
+
+from __future__ import annotations
+
+from typing import Any, NamedTuple
+
+
+class StreamEvent(NamedTuple):
+    """One progress, result or error event from an agent stream.
+
+    ``type`` selects which of the other fields are set: ``message`` for status,
+    routing, tool-call and error events, ``content`` for results, ``agent`` for
+    events about a sub-agent and ``tool_name`` for tool calls.
+    """
+
+    type: str
+    message: str = ""
+    content: Any = None
+    agent: str = ""
+    tool_name: str = ""
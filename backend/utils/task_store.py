@@ -0,0 +1,47 @@
+"""
+task_store.py
+~~~~~~~~~~~~~
+Size-bounded variant of the SDK's in-memory task store.
+
+``InMemoryTaskStore`` keeps every task, with its full history and artifacts, for
+the life of the process. ``LruTaskStore`` keeps at most ``max_size`` tasks and
+evicts the least recently saved or read one. Tasks that are still running are
+re-saved on every update, so eviction reaches finished tasks first.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import Task
+
+# Default number of tasks an agent server keeps in memory.
+DEFAULT_TASK_STORE_SIZE = 1024
+
+
+class LruTaskStore(InMemoryTaskStore):
+    """In-memory task store that evicts the least recently used task beyond ``max_size``."""
+
+    def __init__(self, max_size: int = DEFAULT_TASK_STORE_SIZE) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        super().__init__()
+        self.max_size = max_size
+        self.tasks: OrderedDict[str, Task] = OrderedDict()
+
+    async def save(self, task: Task) -> None:
+        """Save or update a task, evicting the oldest one if the store is full."""
+        async with self.lock:
+            self.tasks[task.id] = task
+            self.tasks.move_to_end(task.id)
+            if len(self.tasks) > self.max_size:
+                self.tasks.popitem(last=False)
+
+    async def get(self, task_id: str) -> Task | None:
+        """Retrieve a task by ID, marking it as recently used."""
+        async with self.lock:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                self.tasks.move_to_end(task_id)
+            return task
@@ -13,18 +13,77 @@ Environment:
 """
 
 from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 from google.cloud import discoveryengine_v1beta as de
 
+logger = logging.getLogger(__name__)
+
 
 class VertexSearchStore:
+    # Seconds the ID index behind get_by_id is reused before the catalog is fetched again
+    CATALOG_TTL = 30.0
+    # Products fetched per catalog snapshot; anything past this is invisible to the indexes
+    CATALOG_SIZE = 200
+
+    # Results reused for repeated identical searches, e.g. an agent re-issuing the same tool call
+    SEARCH_CACHE_TTL = 30.0
+    SEARCH_CACHE_SIZE = 256
+
     def __init__(self, *, serving_config: str) -> None:
         self.serving_config = serving_config
         self._client = de.SearchServiceClient()
+        self._catalog_index: dict[str, dict] = {}
+        # Lowercased SKU -> hit, built alongside the ID index
+        self._sku_index: dict[str, dict] = {}
+        # (quantities, hits) for in-stock hits sorted by stock_quantity; swapped as one tuple
+        self._stock_index: tuple[list[float], list[dict]] = ([], [])
+        self._catalog_expires = 0.0
+        # Tools call the store from worker threads: one lock guards the search cache,
+        # another makes concurrent lookups share a single catalog refresh
+        self._cache_lock = threading.Lock()
+        self._catalog_lock = threading.Lock()
+        # (query, top_k) -> (hits, monotonic expiry)
+        self._search_cache: OrderedDict[tuple[str, int], tuple[list[dict], float]] = OrderedDict()
 
     def search(self, query: str, *, top_k: int = 5) -> list[dict]:
-        """Hybrid (text + vector) search of the data-store."""
+        """Hybrid (text + vector) search of the data-store.
+
+        Results are cached per ``(query, top_k)`` for ``SEARCH_CACHE_TTL`` seconds; callers
+        get a fresh list but share the hit dicts, which must be treated as read-only.
+        """
+        key = (query, top_k)
+        with self._cache_lock:
+            cached = self._search_cache.get(key)
+            if cached is not None and time.monotonic() < cached[1]:
+                self._search_cache.move_to_end(key)
+                return list(cached[0])
+
+        hits = self._search(query, top_k)
+        with self._cache_lock:
+            self._search_cache[key] = (hits, time.monotonic() + self.SEARCH_CACHE_TTL)
+            self._search_cache.move_to_end(key)
+            if len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        return list(hits)
+
+    def clear_cache(self) -> None:
+        """Drop cached searches and the catalog indexes, e.g. after the data-store was re-imported."""
+        with self._cache_lock:
+            self._search_cache.clear()
+        with self._catalog_lock:
+            self._catalog_index = {}
+            self._sku_index = {}
+            self._stock_index = ([], [])
+            self._catalog_expires = 0.0
+
+    def _search(self, query: str, top_k: int) -> list[dict]:
         req = de.SearchRequest(
             serving_config=self.serving_config,
             query=query,
@@ -103,15 +162,71 @@ class VertexSearchStore:
         return hits
 
     def get_by_id(self, product_id: str) -> dict | None:
-        """Get a product by exact ID match."""
-        # Get many products and filter for exact match
-        results = self.search(query="", top_k=200)
-
+        """Get a product by exact ID match.
+
+        Lookups go through an ID index over a catalog snapshot that is refreshed at most
+        every ``CATALOG_TTL`` seconds, instead of fetching and scanning the catalog each time.
+        """
+        self._refresh_catalog()
+        return self._catalog_index.get(product_id)
+
+    def get_by_sku(self, sku: str) -> dict | None:
+        """Get a product by case-insensitive SKU match, using the same catalog snapshot as ``get_by_id``."""
+        self._refresh_catalog()
+        return self._sku_index.get(sku.lower())
+
+    def get_low_stock(self, threshold: float) -> list[dict]:
+        """Get in-stock products with ``stock_quantity`` below ``threshold``, lowest stock first.
+
+        The catalog snapshot keeps its in-stock hits sorted by quantity, so this is a bisect
+        and a slice rather than a search plus a scan. Like ``get_by_id``, results can be up to
+        ``CATALOG_TTL`` seconds stale and only cover the first ``CATALOG_SIZE`` products.
+        """
+        self._refresh_catalog()
+        quantities, hits = self._stock_index
+        return hits[: bisect.bisect_left(quantities, threshold)]
+
+    def _refresh_catalog(self) -> None:
+        """Rebuild the ID, SKU and stock indexes if the catalog snapshot has expired."""
+        if time.monotonic() < self._catalog_expires:
+            return
+
+        with self._catalog_lock:
+            # Another thread may have refreshed the snapshot while we waited for the lock
+            if time.monotonic() < self._catalog_expires:
+                return
+            self._rebuild_catalog()
+
+    def _rebuild_catalog(self) -> None:
+        # Get many products and index them; the first hit for an ID or SKU wins
+        index: dict[str, dict] = {}
+        sku_index: dict[str, dict] = {}
+        in_stock: list[tuple[float, dict]] = []
+        results = self.search(query="", top_k=self.CATALOG_SIZE)
+        if len(results) >= self.CATALOG_SIZE:
+            logger.warning(
+                "Catalog snapshot hit its %d-product cap; ID, SKU and low-stock lookups miss the rest",
+                self.CATALOG_SIZE,
+            )
         for result in results:
-            if result.get("id") == product_id:
-                return result
-
-        return None
+            if result.get("id") in index:
+                continue
+            index[result.get("id")] = result
+
+            # Product fields are either flattened into the hit or nested under "metadata"
+            source = result["metadata"] if isinstance(result.get("metadata"), dict) else result
+            sku = source.get("sku")
+            if isinstance(sku, str) and sku:
+                sku_index.setdefault(sku.lower(), result)
+            stock = source.get("stock_quantity")
+            if isinstance(stock, int | float) and not isinstance(stock, bool) and stock > 0:
+                in_stock.append((stock, result))
+        in_stock.sort(key=lambda item: item[0])
+
+        self._catalog_index = index
+        self._sku_index = sku_index
+        self._stock_index = ([stock for stock, _ in in_stock], [result for _, result in in_stock])
+        self._catalog_expires = time.monotonic() + self.CATALOG_TTL
 
     def _extract_proto_value(self, value: Any) -> Any:
         """Extract a simple value from a proto-plus Value or any proto object."""